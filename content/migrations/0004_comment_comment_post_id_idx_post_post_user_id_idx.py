@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 18:11
+
+import core.operations
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('content', '0003_alter_comment_body_alter_post_body_alter_post_title'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        core.operations.AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['post', 'id'], name='comment_post_id_idx'),
+        ),
+        core.operations.AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(fields=['user', 'id'], name='post_user_id_idx'),
+        ),
+    ]
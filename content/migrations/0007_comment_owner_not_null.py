@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 09:12
+
+import core.operations
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('content', '0006_post_comment_timestamps'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='owner',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        core.operations.AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['owner', 'id'], name='comment_owner_id_idx'),
+        ),
+    ]
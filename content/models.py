@@ -1,21 +1,46 @@
 from django.db import models
 from django.conf import settings
 
+from core.models import OwnedModel, VersionedModel
 
-class Post(models.Model):
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="posts")
+
+class Post(VersionedModel):
+    cache_resource = 'posts'
+    cache_owner_path = 'user_id'
+    cache_dependents = ('comments',)
+
+    # Every index below leads with user, so the foreign key needs none of its own.
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="posts",
+                             db_index=False)
     title = models.CharField(max_length=150)
     body = models.TextField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='post_user_id_idx'),
+            models.Index(fields=['user', 'updated_at'], name='post_user_updated_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
 
-class Comment(models.Model):
-    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
+class Comment(OwnedModel):
+    cache_resource = 'comments'
+    owner_source = 'post__user_id'
+
+    # comment_post_id_idx leads with post, so the foreign key needs no index of its own.
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments", db_index=False)
     name = models.CharField(max_length=100)
     email = models.EmailField()
     body = models.TextField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'id'], name='comment_post_id_idx'),
+            models.Index(fields=['owner', 'id'], name='comment_owner_id_idx'),
+            models.Index(fields=['owner', 'updated_at'], name='comment_owner_updated_idx'),
+        ]
+
     def __str__(self):
         return self.name
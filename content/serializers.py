@@ -1,26 +1,36 @@
 from rest_framework import serializers
 from .models import Post, Comment
 from django.contrib.auth import get_user_model
+from core.serializers import BatchedPrimaryKeyRelatedField, BulkListSerializer, EmbedMixin, SparseFieldsetMixin
 
 User = get_user_model()
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(EmbedMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    serializer_related_field = BatchedPrimaryKeyRelatedField
+    embeddable = {'comments': 'content.serializers.CommentSerializer'}
+    expandable = {'user': 'users.serializers.UserSerializer'}
+    preview = ('comments', '-id')
+
     userId = serializers.PrimaryKeyRelatedField(source='user', read_only=True)
 
     class Meta:
         model = Post
+        list_serializer_class = BulkListSerializer
         fields = ['id', 'userId', 'title', 'body', 'user']
         extra_kwargs = {
             'user': {'write_only': True, 'required': True},
         }
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    serializer_related_field = BatchedPrimaryKeyRelatedField
+
     postId = serializers.PrimaryKeyRelatedField(source='post', read_only=True)
 
     class Meta:
         model = Comment
+        list_serializer_class = BulkListSerializer
         fields = ['id', 'postId', 'name', 'email', 'body', 'post']
 
         extra_kwargs = {
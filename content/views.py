@@ -1,17 +1,21 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
-from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from .models import Post, Comment
 from .serializers import PostSerializer, CommentSerializer
-from django.core.cache import cache
+from core.mixins import BulkCreateMixin, CachedListMixin
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(BulkCreateMixin, CachedListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = PostSerializer
     queryset = Post.objects.all()
+    cache_resource = 'posts'
+    filter_params = {'userId': 'user_id'}
+    ordering_fields = ['id', 'title']
+    ordering = ['id']
+    owner_field = 'user'
 
     def get_queryset(self):
         return Post.objects.filter(user=self.request.user)
@@ -19,50 +23,28 @@ class PostViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-    def list(self, request, *args, **kwargs):
-        cache_key = f'posts_list_user_{request.user.pk}'
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return Response(cached_data)
-        response = super().list(request, *args, **kwargs)
-        data_cache = response.data
-        cache.set(cache_key, data_cache)
-        return Response(data_cache)
-
     @action(detail=True, methods=['get'])
     def comments(self, request, pk=None):
-        post = self.get_object()
-        cache_key = f'post_{post.pk}_comments_user_{request.user.pk}'
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return Response(cached_data)
-        comments = post.comments.all()
-        serializer = CommentSerializer(comments, many=True)
-        data = serializer.data
-        cache.set(cache_key, data)
-        return Response(data)
+        post = self.get_parent()
+        return self.nested_response(CommentViewSet, request.user.pk, post.comments.all())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(BulkCreateMixin, CachedListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = CommentSerializer
+    owned_parent_field = 'post'
+    owned_parent_message = "You can only create comments on your own posts."
     queryset = Comment.objects.all()
+    cache_resource = 'comments'
+    filter_params = {'postId': 'post_id'}
+    ordering_fields = ['id', 'name']
+    ordering = ['id']
 
     def get_queryset(self):
-        return Comment.objects.filter(post__user=self.request.user)
+        return Comment.objects.filter(owner=self.request.user)
 
     def perform_create(self, serializer):
         post_instance = serializer.validated_data.get('post')
-        if post_instance and post_instance.user != self.request.user:
-            raise PermissionDenied("You can only create comments on your own posts.")
+        if post_instance and post_instance.user_id != self.request.user.pk:
+            raise PermissionDenied(self.owned_parent_message)
         serializer.save()
-
-    def list(self, request, *args, **kwargs):
-        cache_key = f'comments_list_user_{request.user.pk}'
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return Response(cached_data)
-        response = super().list(request, *args, **kwargs)
-        data_cache = response.data
-        cache.set(cache_key, data_cache)
-        return Response(data_cache)
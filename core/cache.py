@@ -0,0 +1,229 @@
+import hashlib
+import json
+import math
+import random
+import struct
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from . import local
+
+GLOBAL_SCOPE = 'all'
+
+DEFAULTS = {
+    # Seconds an entry counts as fresh.
+    'TIMEOUT': 60 * 60,
+    # Seconds an expired entry is kept and served while one worker refreshes it.
+    'STALE_GRACE': 60,
+    # XFetch weight for refreshing before expiry; 0 disables early refresh.
+    'EARLY_REFRESH_BETA': 1.0,
+    # Seconds the refresh lock is held at most, and a cold miss waits for it.
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 2.0,
+    # Serve the previous generation's body while the first request after a
+    # write recomputes. Only safe for data nobody expects to read back.
+    'STALE_ACROSS_WRITES': False,
+    # Keep entries in an in-process LRU in front of the shared cache. Only
+    # entries up to LOCAL_MAX_ENTRY_BYTES are admitted.
+    'LOCAL': False,
+    'LOCAL_TIMEOUT': 30,
+    'LOCAL_MAX_ENTRIES': 1024,
+    'LOCAL_MAX_ENTRY_BYTES': 256 * 1024,
+    # Seconds a worker trusts its copy of a generation; 0 always asks the
+    # shared cache. Bumps reach other workers through INVALIDATION_CHANNEL,
+    # this only bounds the damage of a lost message.
+    'GENERATION_TTL': 0,
+    'INVALIDATION_CHANNEL': 'core.local.LocalChannel',
+}
+
+ENTRY_HEADER = struct.Struct('!ddI')
+
+
+_channels = {}
+
+
+def cache_setting(resource, name):
+    config = getattr(settings, 'API_CACHE', {})
+    family = config.get('FAMILIES', {}).get(resource, {})
+    return family.get(name, config.get(name, DEFAULTS[name]))
+
+
+def get_timeout(resource):
+    return cache_setting(resource, 'TIMEOUT')
+
+
+def invalidation_channel():
+    path = cache_setting(None, 'INVALIDATION_CHANNEL')
+    if path not in _channels:
+        _channels[path] = import_string(path)()
+    return _channels[path]
+
+
+def generation_key(resource, owner_id=None):
+    scope = GLOBAL_SCOPE if owner_id is None else owner_id
+    return f'gen:{resource}:{scope}'
+
+
+def _seed():
+    # Seeding from the clock means a counter that was evicted never restarts
+    # at a generation some older cached value was stored under.
+    return time.time_ns() // 1000
+
+
+def get_generation(resource, owner_id=None):
+    key = generation_key(resource, owner_id)
+    ttl = cache_setting(resource, 'GENERATION_TTL')
+    if ttl:
+        invalidation_channel().ensure_listening()
+        generation = local.generations.get(key)
+        if generation is not None:
+            return generation
+
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _seed(), timeout=None)
+        generation = cache.get(key)
+    if ttl and generation is not None:
+        local.generations.set(key, generation, ttl, cache_setting(None, 'LOCAL_MAX_ENTRIES'))
+    return generation
+
+
+def bump_generation(resource, owner_id=None):
+    key = generation_key(resource, owner_id)
+    try:
+        generation = cache.incr(key)
+    except ValueError:
+        cache.add(key, _seed(), timeout=None)
+        generation = cache.get(key)
+    invalidation_channel().publish(key)
+    return generation
+
+
+_deferred = ContextVar('deferred_invalidations', default=None)
+
+
+@contextmanager
+def deferred_invalidation():
+    # Collects the invalidations of a block of writes and performs each
+    # distinct one once when the block completes.
+    pending = {}
+    token = _deferred.set(pending)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+    for resource, owner_ids in pending.items():
+        invalidate(resource, owner_ids)
+
+
+def invalidate(resource, owner_ids=(None,)):
+    owner_ids = set(owner_ids)
+    pending = _deferred.get()
+    if pending is not None:
+        pending.setdefault(resource, set()).update(owner_ids)
+        return
+    for owner_id in owner_ids:
+        bump_generation(resource, owner_id)
+
+    # A reader may refill the cache from the pre-commit snapshot between the
+    # bump above and the commit, so bump once more after the commit lands.
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: [bump_generation(resource, owner_id) for owner_id in owner_ids])
+
+
+def make_key(resource, owner_id, *parts):
+    generation = get_generation(resource, owner_id)
+    scope = GLOBAL_SCOPE if owner_id is None else owner_id
+    return ':'.join([resource, str(scope), f'g{generation}', *map(str, parts)])
+
+
+def make_latest_key(resource, owner_id, *parts):
+    scope = GLOBAL_SCOPE if owner_id is None else owner_id
+    return ':'.join([resource, str(scope), 'latest', *map(str, parts)])
+
+
+def pack_entry(body, timeout, delta, headers=None):
+    # Entries stay plain bytes: a fixed header, the few response headers that
+    # vary per entry as JSON, then the rendered body.
+    encoded_headers = json.dumps(headers).encode() if headers else b''
+    return ENTRY_HEADER.pack(time.time() + timeout, delta, len(encoded_headers)) + encoded_headers + body
+
+
+def unpack_entry(entry):
+    expiry, delta, headers_length = ENTRY_HEADER.unpack_from(entry)
+    body_start = ENTRY_HEADER.size + headers_length
+    headers = json.loads(entry[ENTRY_HEADER.size:body_start]) if headers_length else {}
+    return entry[body_start:], expiry, delta, headers
+
+
+def should_refresh(expiry, delta, beta):
+    # XFetch: the closer the expiry and the costlier the recompute (delta),
+    # the likelier a single reader refreshes ahead of everyone else.
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expiry
+
+
+def get_entry(resource, key):
+    """Return the packed entry for key and the tier that served it, if any."""
+    use_local = cache_setting(resource, 'LOCAL')
+    if use_local:
+        entry = local.entries.get(key)
+        local.stats.record('local', entry is not None)
+        if entry is not None:
+            return entry, 'local'
+
+    entry = cache.get(key)
+    local.stats.record('shared', entry is not None)
+    if entry is None:
+        return None, None
+    if use_local:
+        _admit(resource, key, entry)
+    return entry, 'shared'
+
+
+def set_entry(resource, key, entry, timeout):
+    cache.set(key, entry, timeout=timeout)
+    if cache_setting(resource, 'LOCAL'):
+        _admit(resource, key, entry)
+
+
+def _admit(resource, key, entry):
+    if len(entry) <= cache_setting(resource, 'LOCAL_MAX_ENTRY_BYTES'):
+        local.entries.set(key, entry, cache_setting(resource, 'LOCAL_TIMEOUT'),
+                          cache_setting(None, 'LOCAL_MAX_ENTRIES'))
+
+
+def tier_stats():
+    return local.stats.report()
+
+
+def clear_caches():
+    cache.clear()
+    local.entries.clear()
+    local.generations.clear()
+
+
+def acquire_lock(key, timeout):
+    return cache.add(f'lock:{key}', 1, timeout=timeout)
+
+
+def release_lock(key):
+    cache.delete(f'lock:{key}')
+
+
+def query_fingerprint(query_params, media_type='', unordered=()):
+    # Parameters listed in unordered hold comma-separated sets, so their
+    # members are sorted too and ?fields=id,title shares an entry with title,id.
+    pairs = sorted(
+        (key, ','.join(sorted(value.split(','))) if key in unordered else value)
+        for key in query_params for value in query_params.getlist(key)
+    )
+    if not pairs and not media_type:
+        return '-'
+    return hashlib.md5(f'{media_type}?{urlencode(pairs)}'.encode()).hexdigest()[:16]
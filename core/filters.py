@@ -0,0 +1,99 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections, models
+from django.db.models import OuterRef, Prefetch, Subquery
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .serializers import (
+    EMBED_PARAM, EXPAND_PARAM, preview_attr, preview_size, related_serializers, requested_relations,
+    wants_sparse_fieldset,
+)
+
+
+class SparseFieldsetFilter(BaseFilterBackend):
+    """Loads only the columns a sparse-fieldset read will serialize."""
+
+    def filter_queryset(self, request, queryset, view):
+        if not wants_sparse_fieldset(request):
+            return queryset
+        serializer = view.get_serializer()
+        columns = serializer.sparse_columns() if hasattr(serializer, 'sparse_columns') else None
+        return queryset.only(*columns) if columns else queryset
+
+
+def preview_queryset(relation, ordering, size, using):
+    children = relation.related_model._default_manager.order_by(ordering, 'pk')
+    if connections[using].features.supports_over_clause:
+        # A sliced prefetch becomes ROW_NUMBER() OVER (PARTITION BY parent),
+        # so every parent gets its first rows from a single query.
+        return children[:size]
+    parent = relation.field.name
+    first = children.filter(**{parent: OuterRef(parent)}).values('pk')[:size]
+    return children.filter(pk__in=Subquery(first))
+
+
+class EmbedFilter(BaseFilterBackend):
+    """Batches the relations ``?_embed=`` and ``?_expand=`` add to a read.
+
+    Embedded children cost one prefetch query per relation and expanded
+    parents are joined, whatever the number of rows. Previews only read the
+    first rows of each parent.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, 'action', None) not in ('list', 'retrieve'):
+            # Other actions, such as exports, render no embedded relations.
+            return queryset
+        serializer_class = view.get_serializer_class()
+        for param, declared in ((EMBED_PARAM, 'embeddable'), (EXPAND_PARAM, 'expandable')):
+            unknown = requested_relations(request, param) - getattr(serializer_class, declared, {}).keys()
+            if unknown:
+                raise ValidationError({param: [f'Unknown relation "{name}".' for name in sorted(unknown)]})
+        preview = getattr(serializer_class, 'preview', None)
+        size = preview_size(request) if preview is not None else None
+        for name, (related, many) in related_serializers(serializer_class, request).items():
+            if preview is not None and size is not None and name == preview[0]:
+                relation = queryset.model._meta.get_field(name)
+                children = preview_queryset(relation, preview[1], size, queryset.db)
+                queryset = queryset.prefetch_related(Prefetch(name, queryset=children, to_attr=preview_attr(name)))
+            elif many:
+                children = related.Meta.model.objects.order_by('pk')
+                queryset = queryset.prefetch_related(Prefetch(name, queryset=children))
+            else:
+                queryset = queryset.select_related(name)
+        return queryset
+
+
+def parse_value(field, value):
+    if isinstance(field, models.BooleanField):
+        # Accepts the true/false spelling clients send, unlike the model field.
+        return serializers.BooleanField().to_internal_value(value)
+    try:
+        return field.to_python(value)
+    except DjangoValidationError as exc:
+        raise ValidationError(exc.messages)
+
+
+class QueryParamFilter(BaseFilterBackend):
+    """Filters on the exact-match parameters a view whitelists in ``filter_params``.
+
+    ``filter_params`` maps a public parameter name to a model field; repeated
+    parameters match any of their values.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        for param, field_name in getattr(view, 'filter_params', {}).items():
+            values = request.query_params.getlist(param)
+            if not values:
+                continue
+            field = queryset.model._meta.get_field(field_name)
+            try:
+                values = [parse_value(field, value) for value in values]
+            except ValidationError as exc:
+                raise ValidationError({param: exc.detail})
+            if len(values) == 1:
+                queryset = queryset.filter(**{field_name: values[0]})
+            else:
+                queryset = queryset.filter(**{f'{field_name}__in': values})
+        return queryset
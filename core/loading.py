@@ -0,0 +1,93 @@
+import csv
+import io
+
+from django.db import connections
+
+from .cache import invalidate
+from .models import OwnedModel, VersionedModel, assign_owners
+
+COPY_NULL = r'\N'
+COPY_BLOCK_SIZE = 1 << 20
+
+
+def reserve_ids(model, count, using):
+    table = model._meta.db_table
+    column = model._meta.pk.column
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+                       [table, column, count])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def copy_from(cursor, sql, file):
+    raw = cursor.cursor
+    if hasattr(raw, 'copy_expert'):
+        raw.copy_expert(sql, file, size=COPY_BLOCK_SIZE)
+        return
+    with raw.copy(sql) as copy:
+        while block := file.read(COPY_BLOCK_SIZE):
+            copy.write(block)
+
+
+def copy_to(cursor, sql, file):
+    raw = cursor.cursor
+    if hasattr(raw, 'copy_expert'):
+        raw.copy_expert(sql, file, size=COPY_BLOCK_SIZE)
+        return
+    with raw.copy(sql) as copy:
+        for block in copy:
+            file.write(block)
+
+
+def check_constraints_immediately(using='default'):
+    # PostgreSQL queues a trigger event per inserted row for each deferred
+    # foreign key until commit, so a long load would grow the backend with
+    # its row count. Checked immediately, each statement's events are fired
+    # and freed when it ends.
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+def copy_objects(model, objs, using):
+    connection = connections[using]
+    missing = [obj for obj in objs if obj.pk is None]
+    for obj, pk in zip(missing, reserve_ids(model, len(missing), using)):
+        obj.pk = pk
+    fields = model._meta.concrete_fields
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    for obj in objs:
+        # The values an INSERT would send, auto_now and defaults included.
+        values = (field.get_db_prep_save(field.pre_save(obj, True), connection) for field in fields)
+        writer.writerow([COPY_NULL if value is None else value for value in values])
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    sql = (f'COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) '
+           f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')")
+    with connection.cursor() as cursor:
+        buffer.seek(0)
+        copy_from(cursor, sql, buffer)
+    for obj in objs:
+        obj._state.adding = False
+        obj._state.db = using
+
+
+def load_objects(model, objs, using='default'):
+    """Inserts a batch of unsaved rows and sets their primary keys.
+
+    PostgreSQL gets a single ``COPY ... FROM STDIN``, with ids drawn from the
+    table's sequence beforehand; other databases use ``bulk_create``. Either
+    way the owners' caches are invalidated as for any bulk write.
+    """
+    if not objs:
+        return objs
+    if connections[using].vendor != 'postgresql':
+        return model.objects.using(using).bulk_create(objs)
+    if issubclass(model, OwnedModel):
+        assign_owners(model, [obj for obj in objs if obj.owner_id is None])
+    copy_objects(model, objs, using)
+    if issubclass(model, VersionedModel) and model.cache_resource is not None:
+        path = model.cache_owner_path
+        invalidate(model.cache_resource, {None} if path is None else {getattr(obj, path) for obj in objs})
+    return objs
@@ -0,0 +1,141 @@
+import logging
+import select
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCache:
+    """Size-capped, thread-safe LRU with per-entry expiry, private to one worker."""
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout, max_entries):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TierStats:
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def record(self, tier, hit):
+        self.counts[(tier, hit)] += 1
+
+    def report(self):
+        report = {}
+        for tier in ('local', 'shared'):
+            hits, misses = self.counts[(tier, True)], self.counts[(tier, False)]
+            lookups = hits + misses
+            report[tier] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': hits / lookups if lookups else None,
+            }
+        return report
+
+    def reset(self):
+        self.counts.clear()
+
+
+entries = LocalCache()
+generations = LocalCache()
+stats = TierStats()
+
+
+class LocalChannel:
+    """Delivers invalidations to this process only; the default and the test stand-in."""
+
+    def publish(self, key):
+        self.deliver(key)
+
+    def deliver(self, key):
+        generations.delete(key)
+
+    def ensure_listening(self):
+        pass
+
+
+class PostgresChannel(LocalChannel):
+    """Broadcasts generation bumps to every worker through LISTEN/NOTIFY.
+
+    NOTIFY is transactional, so other workers drop their copy exactly when
+    the write becomes visible to them. Outside Postgres it behaves like
+    LocalChannel.
+    """
+
+    name = 'api_cache_invalidation'
+
+    def __init__(self):
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def publish(self, key):
+        super().publish(key)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_notify(%s, %s)', [self.name, key])
+
+    def ensure_listening(self):
+        if self._thread is not None or connection.vendor != 'postgresql':
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, args=(connection.get_connection_params(),),
+                                                name='cache-invalidation', daemon=True)
+                self._thread.start()
+
+    def _listen(self, params):
+        import psycopg2
+        import psycopg2.extensions
+
+        while True:
+            try:
+                listener = psycopg2.connect(**params)
+                listener.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                listener.cursor().execute(f'LISTEN {self.name}')
+                # Anything published while we were not listening is lost.
+                generations.clear()
+                while True:
+                    if select.select([listener], [], [], 30) == ([], [], []):
+                        continue
+                    listener.poll()
+                    while listener.notifies:
+                        self.deliver(listener.notifies.pop(0).payload)
+            except Exception:
+                logger.exception('Cache invalidation listener failed, reconnecting')
+                generations.clear()
+                time.sleep(1)
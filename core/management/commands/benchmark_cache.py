@@ -0,0 +1,63 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from core import local
+from core.cache import pack_entry, unpack_entry
+from media.models import Album, Photo
+from media.serializers import PhotoSerializer
+
+
+class Command(BaseCommand):
+    help = ('Compares cache hit latency of pickled response data against pre-rendered JSON bytes '
+            'in the shared and in-process tiers.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        rows, iterations = options['rows'], options['iterations']
+        album = Album(pk=1, user_id=1, title='Benchmark album')
+        photos = [
+            Photo(pk=pk, album=album, title=f'Photo {pk}', url=f'https://example.com/{pk}.png',
+                  thumbnailUrl=f'https://example.com/{pk}-thumb.png')
+            for pk in range(1, rows + 1)
+        ]
+        data = PhotoSerializer(photos, many=True).data
+        renderer = JSONRenderer()
+        body = renderer.render(data)
+
+        cache.set('benchmark:data', data)
+        cache.set('benchmark:bytes', pack_entry(body, 60, 0))
+        local.entries.set('benchmark:bytes', pack_entry(body, 60, 0), 60, 1024)
+
+        def data_hit():
+            return renderer.render(cache.get('benchmark:data'))
+
+        def bytes_hit():
+            return unpack_entry(cache.get('benchmark:bytes'))[0]
+
+        def local_hit():
+            return unpack_entry(local.entries.get('benchmark:bytes'))[0]
+
+        assert data_hit() == bytes_hit() == local_hit()
+        self.stdout.write(f'{rows} photos, {len(body)} bytes, {iterations} hits each')
+        for name, hit in (('pickled data + render', data_hit), ('rendered bytes', bytes_hit),
+                          ('in-process tier', local_hit)):
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                hit()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'{name:>22}: mean {statistics.fmean(timings):.3f} ms, '
+                f'p50 {timings[len(timings) // 2]:.3f} ms, p95 {timings[int(len(timings) * 0.95)]:.3f} ms'
+            )
+
+        cache.delete_many(['benchmark:data', 'benchmark:bytes'])
+        local.entries.delete('benchmark:bytes')
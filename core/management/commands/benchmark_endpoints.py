@@ -0,0 +1,250 @@
+import json
+import statistics
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import local
+from core.cache import clear_caches
+from media.models import Photo
+
+Scenario = namedtuple('Scenario', 'name method path body modes')
+
+MODES = ('cold', 'warm')
+# Allowed growth over the baseline, as a fraction of the baseline value.
+THRESHOLDS = {
+    'p50_ms': 0.25,
+    'p95_ms': 0.25,
+    'p99_ms': 0.5,
+    'queries': 0.0,
+    'query_ms': 0.5,
+    'cache_misses': 0.0,
+    'bytes': 0.1,
+}
+# Timings this close to the baseline are noise whatever the ratio.
+LATENCY_FLOOR_MS = 1.0
+
+
+class QueryTimer:
+    """Counts and times the queries run through a connection.
+
+    Django rounds the time it records per query to the millisecond, which
+    reads most queries as zero.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def percentile(values, percent):
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+def parse_thresholds(values):
+    thresholds = dict(THRESHOLDS)
+    for value in values:
+        metric, _, fraction = value.partition('=')
+        if metric not in THRESHOLDS:
+            raise CommandError(f'Unknown metric {metric!r}; choose from {", ".join(THRESHOLDS)}.')
+        try:
+            thresholds[metric] = float(fraction)
+        except ValueError:
+            raise CommandError(f'--threshold {value}: expected {metric}=<fraction>.')
+    return thresholds
+
+
+def regressions(report, baseline, thresholds):
+    found = []
+    for name, metrics in report['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if previous is None:
+            continue
+        for metric, allowed in thresholds.items():
+            before, after = previous.get(metric), metrics[metric]
+            if before is None:
+                continue
+            # Checked first, so a zero or near-zero baseline cannot turn a
+            # timer tick into a regression.
+            if metric.endswith('_ms') and after - before <= LATENCY_FLOOR_MS:
+                continue
+            if after <= before * (1 + allowed):
+                continue
+            found.append((name, metric, before, after))
+    return found
+
+
+class Command(BaseCommand):
+    help = ('Requests every API route in-process, cold (caches cleared before each request) and warm, as one '
+            'user and reports latency percentiles, SQL queries, cache hits and misses and response bytes as '
+            'JSON. With --baseline, fails when a metric grew past its threshold. Clears the configured caches; '
+            'run it against a benchmark database, e.g. one filled by generate_dataset or a snapshot.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Measured requests per route and mode.')
+        parser.add_argument('--user', help='Username to request as; defaults to the owner of the most photos.')
+        parser.add_argument('--snapshot', help='Restore this snapshot directory first.')
+        parser.add_argument('--output', default='benchmark.json', help='Where to write the JSON report.')
+        parser.add_argument('--baseline', help='A previous report to compare against.')
+        parser.add_argument('--threshold', action='append', default=[], metavar='METRIC=FRACTION',
+                            help='Allowed growth over the baseline, e.g. p95_ms=0.1. Repeatable.')
+
+    def handle(self, *args, **options):
+        thresholds = parse_thresholds(options['threshold'])
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1.')
+        if options['snapshot']:
+            call_command('snapshot', 'restore', options['snapshot'], stdout=self.stdout)
+        user = self.get_user(options['user'])
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+        report = {
+            'created': timezone.now().isoformat(),
+            'vendor': connection.vendor,
+            'user': user.pk,
+            'requests': options['requests'],
+            'scenarios': {},
+        }
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for scenario in self.scenarios(user):
+                for mode in scenario.modes:
+                    metrics = self.measure(scenario, mode, options['requests'])
+                    report['scenarios'][f'{scenario.name}:{mode}'] = metrics
+                    self.stdout.write(
+                        f'{scenario.name + ":" + mode:<24} p50 {metrics["p50_ms"]:8.2f} ms  '
+                        f'p95 {metrics["p95_ms"]:8.2f} ms  p99 {metrics["p99_ms"]:8.2f} ms  '
+                        f'{metrics["queries"]:6.1f} queries  {metrics["cache_hits"]:4.1f}/'
+                        f'{metrics["cache_misses"]:.1f} hit/miss  {metrics["bytes"]:.0f} bytes'
+                    )
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+        self.stdout.write(f'Report written to {options["output"]}.')
+
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as file:
+                    baseline = json.load(file)
+            except FileNotFoundError:
+                raise CommandError(f'No baseline at {options["baseline"]}.')
+            found = regressions(report, baseline, thresholds)
+            for name, metric, before, after in found:
+                self.stdout.write(self.style.ERROR(f'{name} {metric}: {before:.2f} -> {after:.2f}'))
+            if found:
+                raise CommandError(f'{len(found)} metrics regressed against {options["baseline"]}.')
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
+
+    def get_user(self, username):
+        User = get_user_model()
+        if username is not None:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'No user named {username}.')
+        # The heaviest owner shows the worst case of every owner-scoped route.
+        top = Photo.objects.values('owner').annotate(photos=Count('pk')).order_by('-photos', 'owner').first()
+        user = User.objects.filter(pk=top['owner']).first() if top else User.objects.order_by('pk').first()
+        if user is None:
+            raise CommandError('The database has no users; run generate_dataset first.')
+        return user
+
+    def scenarios(self, user):
+        router = import_module(settings.ROOT_URLCONF).router
+        scenarios, list_paths = [], []
+        for prefix, viewset, basename in router.registry:
+            path = reverse(f'{basename}-list')
+            list_paths.append(path)
+            scenarios.append(Scenario(f'{basename}-list', 'get', path, None, MODES))
+            if basename == 'user':
+                pk = user.pk
+            else:
+                rows = self.client.get(path, {'page_size': 1}).json()
+                if not rows:
+                    self.stdout.write(self.style.WARNING(f'No {prefix} to request in detail; skipped.'))
+                    continue
+                pk = rows[0]['id']
+            scenarios.append(Scenario(f'{basename}-detail', 'get', reverse(f'{basename}-detail', args=[pk]),
+                                      None, MODES))
+            for action in viewset.get_extra_actions():
+                if 'get' not in action.mapping:
+                    continue
+                name = f'{basename}-{action.url_name}'
+                path = reverse(name, args=[pk]) if action.detail else reverse(name)
+                scenarios.append(Scenario(name, 'get', path, None, MODES))
+
+        batch = {'requests': [{'method': 'GET', 'path': path} for path in list_paths]}
+        scenarios.append(Scenario('batch', 'post', reverse('batch'), batch, MODES))
+        # Writes are rolled back, so they come last and leave the data as it was.
+        changeset = {'operations': [{'op': 'create', 'resource': 'todos',
+                                     'data': {'user': user.pk, 'title': 'Benchmark', 'completed': False}}]}
+        scenarios.append(Scenario('changeset', 'post', reverse('changeset'), changeset, ('write',)))
+        return scenarios
+
+    def request(self, scenario):
+        if scenario.body is None:
+            return getattr(self.client, scenario.method)(scenario.path)
+        return getattr(self.client, scenario.method)(scenario.path, scenario.body, format='json')
+
+    def measure(self, scenario, mode, requests):
+        if mode == 'warm':
+            self.request(scenario)
+        timings, queries, query_ms, hits, misses, sizes = [], 0, 0.0, 0, 0, []
+        for _ in range(requests):
+            if mode == 'cold':
+                clear_caches()
+            local.stats.reset()
+            timer = QueryTimer()
+            with transaction.atomic() if mode == 'write' else nullcontext(), connection.execute_wrapper(timer):
+                started = time.perf_counter()
+                response = self.request(scenario)
+                body = b''.join(response.streaming_content) if response.streaming else response.content
+                timings.append((time.perf_counter() - started) * 1000)
+                if mode == 'write':
+                    transaction.set_rollback(True)
+            if response.status_code >= 400:
+                raise CommandError(f'{scenario.method.upper()} {scenario.path} returned {response.status_code}: '
+                                   f'{body[:200]!r}')
+            queries += timer.count
+            query_ms += timer.seconds * 1000
+            for (_, hit), count in local.stats.counts.items():
+                if hit:
+                    hits += count
+                else:
+                    misses += count
+            sizes.append(len(body))
+        return {
+            'method': scenario.method.upper(),
+            'path': scenario.path,
+            'status': response.status_code,
+            'mean_ms': statistics.fmean(timings),
+            'p50_ms': percentile(timings, 50),
+            'p95_ms': percentile(timings, 95),
+            'p99_ms': percentile(timings, 99),
+            'queries': queries / requests,
+            'query_ms': query_ms / requests,
+            'cache_hits': hits / requests,
+            'cache_misses': misses / requests,
+            'bytes': statistics.fmean(sizes),
+        }
@@ -0,0 +1,160 @@
+import cProfile
+import gc
+import json
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from content.models import Comment, Post
+from content.serializers import CommentSerializer, PostSerializer
+from core.management.commands.generate_dataset import WORDS
+from media.models import Album, Photo
+from media.serializers import AlbumSerializer, PhotoSerializer
+from todos.models import Todo
+from todos.serializers import TodoSerializer
+from users.models import Users
+from users.serializers import UserSerializer
+
+# Serializing this many rows first shows whether a field reaches the
+# database per row.
+PROBE_ROWS = 100
+
+
+class RowFactory:
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+
+    def text(self, words):
+        return ' '.join(self.random.choices(WORDS, k=words))
+
+    def user(self, pk):
+        return Users(pk=pk, username=f'user{pk}', email=f'user{pk}@example.com', first_name=self.text(1).title(),
+                     last_name=self.text(1).title(), street=self.text(2).title(), suite=f'Apt. {pk % 1000}',
+                     city=self.text(1).title(), zipcode=10000 + pk % 90000, lat=self.random.uniform(-90, 90),
+                     lng=self.random.uniform(-180, 180), phone='1-770-736-8031', website='hildegard.org',
+                     company_name=self.text(2).title())
+
+    def post(self, pk):
+        return Post(pk=pk, user_id=pk // 10 + 1, title=self.text(6), body=self.text(30))
+
+    def comment(self, pk):
+        return Comment(pk=pk, post_id=pk // 5 + 1, owner_id=pk // 50 + 1, name=self.text(4),
+                       email='reader@example.com', body=self.text(20))
+
+    def album(self, pk):
+        return Album(pk=pk, user_id=pk // 10 + 1, title=self.text(5))
+
+    def photo(self, pk):
+        color = f'{self.random.randrange(1 << 24):06x}'
+        return Photo(pk=pk, album_id=pk // 50 + 1, owner_id=pk // 500 + 1, title=self.text(6),
+                     url=f'https://via.placeholder.com/600/{color}',
+                     thumbnailUrl=f'https://via.placeholder.com/150/{color}')
+
+    def todo(self, pk):
+        return Todo(pk=pk, user_id=pk // 20 + 1, title=self.text(5), completed=self.random.random() < 0.5)
+
+
+SERIALIZERS = {
+    'users': (UserSerializer, RowFactory.user),
+    'posts': (PostSerializer, RowFactory.post),
+    'comments': (CommentSerializer, RowFactory.comment),
+    'albums': (AlbumSerializer, RowFactory.album),
+    'photos': (PhotoSerializer, RowFactory.photo),
+    'todos': (TodoSerializer, RowFactory.todo),
+}
+
+
+def serialize(serializer_class, rows):
+    return serializer_class(rows, many=True).data
+
+
+class Command(BaseCommand):
+    help = ('Times to_representation of the user, post, comment, album, photo and todo serializers over '
+            'in-memory rows: rows/s over the best of --repeat runs, memory traced per row and queries per '
+            'row. With --profile, also writes one cProfile file per run, which snakeviz or flameprof draw '
+            'as a flame graph.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--serializer', action='append', choices=list(SERIALIZERS),
+                            help='Only benchmark this serializer. Repeatable; all by default.')
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--profile', help='Directory to write <serializer>-<rows>.prof files to.')
+        parser.add_argument('--output', help='Where to write the results as JSON.')
+
+    def handle(self, *args, **options):
+        if min(options['rows']) < 1 or options['repeat'] < 1:
+            raise CommandError('--rows and --repeat must be at least 1.')
+        profile_dir = Path(options['profile']) if options['profile'] else None
+        if profile_dir is not None:
+            profile_dir.mkdir(parents=True, exist_ok=True)
+        results = []
+        for name in options['serializer'] or SERIALIZERS:
+            serializer_class, build = SERIALIZERS[name]
+            for count in options['rows']:
+                factory = RowFactory(options['seed'])
+                rows = [build(factory, pk) for pk in range(1, count + 1)]
+                result = {'serializer': name, 'rows': count, **self.measure(serializer_class, rows, options)}
+                if profile_dir is not None:
+                    path = profile_dir / f'{name}-{count}.prof'
+                    profiler = cProfile.Profile()
+                    profiler.runcall(serialize, serializer_class, rows)
+                    profiler.dump_stats(path)
+                    result['profile'] = str(path)
+                results.append(result)
+                self.stdout.write(
+                    f'{name:>9} {count:>7} rows: {result["rows_per_sec"]:>10,.0f} rows/s  '
+                    f'{result["us_per_row"]:7.2f} us/row  {result["blocks_per_row"]:6.1f} blocks/row  '
+                    f'{result["bytes_per_row"]:7.0f} B/row  peak {result["peak_bytes_per_row"]:7.0f} B/row'
+                )
+                if result['queries_per_row']:
+                    self.stdout.write(self.style.WARNING(
+                        f'{name} runs {result["queries_per_row"]:.2f} queries per row.'))
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}.')
+
+    def measure(self, serializer_class, rows, options):
+        with CaptureQueriesContext(connection) as captured:
+            serialize(serializer_class, rows[:PROBE_ROWS])
+        probed = min(len(rows), PROBE_ROWS)
+
+        timings = []
+        for _ in range(options['repeat']):
+            gc.collect()
+            started = time.perf_counter()
+            serialize(serializer_class, rows)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+
+        # Tracing starts just before the run, so what is still traced
+        # afterwards is the representation itself; the peak adds the
+        # temporaries freed along the way.
+        gc.collect()
+        tracemalloc.start()
+        try:
+            data = serialize(serializer_class, rows)
+            current, peak = tracemalloc.get_traced_memory()
+            blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        finally:
+            tracemalloc.stop()
+        del data
+
+        count = len(rows)
+        return {
+            'seconds': best,
+            'rows_per_sec': count / best,
+            'us_per_row': best / count * 1e6,
+            'blocks_per_row': blocks / count,
+            'bytes_per_row': current / count,
+            'peak_bytes_per_row': peak / count,
+            'queries_per_row': len(captured) / probed,
+        }
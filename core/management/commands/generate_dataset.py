@@ -0,0 +1,154 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from content.models import Comment, Post
+from core.cache import deferred_invalidation
+from core.loading import check_constraints_immediately, load_objects
+from media.models import Album, Photo
+from todos.models import Todo
+
+# JSONPlaceholder's shape: 10 posts with 5 comments each, 10 albums with 50
+# photos each and 20 todos per user.
+COMMENTS_PER_POST = 5
+PHOTOS_PER_ALBUM = 50
+UNIFORM = {'posts': 10, 'albums': 10, 'todos': 20}
+WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore et '
+         'dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip ex ea '
+         'commodo consequat').split()
+
+
+class BatchWriter:
+
+    def __init__(self, model, batch_size, on_flush=None):
+        self.model = model
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self.batch = []
+        self.rows = 0
+
+    def add(self, obj):
+        self.batch.append(obj)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        batch, self.batch = self.batch, []
+        load_objects(self.model, batch)
+        self.rows += len(batch)
+        if self.on_flush is not None:
+            self.on_flush(batch)
+
+
+def skewed_counts(users, whales, exponent, whale_count):
+    # The top ranks are whales; everyone after follows a Zipf tail from
+    # half a whale down, with at least one row each.
+    return [whale_count if rank < whales else max(1, round(whale_count / (rank - whales + 2) ** exponent))
+            for rank in range(users)]
+
+
+class Command(BaseCommand):
+    help = ('Generates users and their posts, comments, albums, photos and todos through the bulk write path. '
+            'With --skew zipf a few whale users own --whale-photos photos each and the rest follow a Zipf tail; '
+            'uniform gives every user the JSONPlaceholder amounts. The same --seed generates the same data.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--skew', choices=('zipf', 'uniform'), default='zipf')
+        parser.add_argument('--whales', type=int, default=3)
+        parser.add_argument('--whale-photos', type=int, default=50000)
+        parser.add_argument('--exponent', type=float, default=1.1, help='Zipf exponent of the tail.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='user', help='Usernames are <prefix><n>.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        prefix, batch_size = options['prefix'], options['batch_size']
+        if User._base_manager.filter(username__startswith=prefix).exists():
+            raise CommandError(f'Users named {prefix}* already exist; pick another --prefix.')
+        self.random = random.Random(options['seed'])
+        counts = self.plan(options)
+
+        started = time.perf_counter()
+        with transaction.atomic(), deferred_invalidation():
+            check_constraints_immediately()
+            users = BatchWriter(User, batch_size)
+            password = make_password(None)
+            for number in range(options['users']):
+                username = f'{prefix}{number}'
+                users.add(User(username=username, email=f'{username}@example.com', password=password,
+                               first_name=self.text(1).title(), last_name=self.text(1).title(),
+                               city=self.text(1).title(), company_name=self.text(2).title()))
+            users.flush()
+            user_ids = list(User._base_manager.filter(username__startswith=prefix).order_by('pk')
+                            .values_list('pk', flat=True))
+
+            comments = BatchWriter(Comment, batch_size)
+            photos = BatchWriter(Photo, batch_size)
+            posts = BatchWriter(Post, batch_size,
+                                lambda batch: self.children(batch, comments, self.comment, COMMENTS_PER_POST))
+            albums = BatchWriter(Album, batch_size,
+                                 lambda batch: self.children(batch, photos, self.photo, PHOTOS_PER_ALBUM))
+            todos = BatchWriter(Todo, batch_size)
+            for writer, build, resource in ((posts, self.post, 'posts'), (albums, self.album, 'albums'),
+                                            (todos, self.todo, 'todos')):
+                for user_id, count in zip(user_ids, counts[resource]):
+                    for _ in range(count):
+                        writer.add(build(user_id))
+                writer.flush()
+            comments.flush()
+            photos.flush()
+
+        elapsed = time.perf_counter() - started
+        writers = (users, posts, comments, albums, photos, todos)
+        total = sum(writer.rows for writer in writers)
+        for writer in writers:
+            self.stdout.write(f'{writer.model._meta.verbose_name_plural}: {writer.rows}')
+        self.stdout.write(self.style.SUCCESS(f'Generated {total} rows in {elapsed:.2f}s.'))
+
+    def plan(self, options):
+        users = options['users']
+        if options['skew'] == 'uniform':
+            return {resource: [count] * users for resource, count in UNIFORM.items()}
+        # A whale's posts and todos scale with its albums as in JSONPlaceholder.
+        whale_albums = max(1, options['whale_photos'] // PHOTOS_PER_ALBUM)
+        counts = {
+            resource: skewed_counts(users, options['whales'], options['exponent'],
+                                    whale_albums * UNIFORM[resource] // UNIFORM['albums'])
+            for resource in UNIFORM
+        }
+        # Whales land on random users rather than the first ids.
+        order = self.random.sample(range(users), users)
+        return {resource: [values[rank] for rank in order] for resource, values in counts.items()}
+
+    def text(self, words):
+        return ' '.join(self.random.choices(WORDS, k=words))
+
+    def children(self, parents, writer, build, count):
+        for parent in parents:
+            for _ in range(count):
+                writer.add(build(parent))
+
+    def post(self, user_id):
+        return Post(user_id=user_id, title=self.text(6), body=self.text(30))
+
+    def comment(self, post):
+        return Comment(post_id=post.pk, owner_id=post.user_id, name=self.text(4), email='reader@example.com',
+                       body=self.text(20))
+
+    def album(self, user_id):
+        return Album(user_id=user_id, title=self.text(5))
+
+    def photo(self, album):
+        color = f'{self.random.randrange(1 << 24):06x}'
+        return Photo(album_id=album.pk, owner_id=album.user_id, title=self.text(6),
+                     url=f'https://via.placeholder.com/600/{color}',
+                     thumbnailUrl=f'https://via.placeholder.com/150/{color}')
+
+    def todo(self, user_id):
+        return Todo(user_id=user_id, title=self.text(5), completed=self.random.random() < 0.5)
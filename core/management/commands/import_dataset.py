@@ -0,0 +1,246 @@
+import json
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+
+from content.models import Comment, Post
+from core.cache import deferred_invalidation
+from core.loading import check_constraints_immediately, load_objects
+from media.models import Album, Photo
+from todos.models import Todo
+
+RESOURCES = ('users', 'posts', 'comments', 'albums', 'photos', 'todos')
+SUFFIXES = ('.json', '.ndjson', '.jsonl')
+READ_SIZE = 1 << 16
+# A record still undecodable after this much text is malformed, not split
+# across reads.
+MAX_RECORD_SIZE = 1 << 24
+
+
+def iter_array(file, read_size=READ_SIZE):
+    # Decodes a top-level JSON array one element at a time, so only the read
+    # buffer and the current element are ever in memory.
+    decoder = json.JSONDecoder()
+    buffer, position, opened = '', 0, False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer) and not opened:
+            if buffer[position] != '[':
+                raise ValueError('Expected a JSON array.')
+            opened = True
+            position += 1
+            continue
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        if position < len(buffer):
+            try:
+                value, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                pass
+            else:
+                yield value
+                continue
+        if len(buffer) - position > MAX_RECORD_SIZE:
+            raise ValueError(f'Malformed record: {buffer[position:position + 80]!r}')
+        chunk = file.read(read_size)
+        if not chunk:
+            raise ValueError('Unexpected end of file.')
+        buffer, position = buffer[position:] + chunk, 0
+
+
+def iter_records(path):
+    with open(path, encoding='utf-8') as file:
+        if path.suffix == '.json':
+            yield from iter_array(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def rate(rows, elapsed):
+    return f'{rows / elapsed:,.0f} rows/s' if elapsed else 'n/a'
+
+
+def zipcode(value):
+    digits = str(value or '').split('-')[0].strip()
+    return int(digits) if digits.isdigit() else None
+
+
+def number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Loads a JSONPlaceholder-shaped dump (users, posts, comments, albums, photos and todos as JSON arrays '
+            'or NDJSON, one file per resource) in one transaction. Records get new ids; userId, postId and '
+            'albumId are mapped to them. Rows are written with COPY on PostgreSQL and bulk_create elsewhere.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Directory holding users.json, posts.json, ... (.json, .ndjson or .jsonl).')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--defer-indexes', action='store_true',
+                            help='On PostgreSQL, drop the secondary indexes of empty tables while loading '
+                                 'and rebuild them at the end.')
+
+    def handle(self, *args, **options):
+        files = self.find_files(Path(options['path']))
+        User = get_user_model()
+        # Only ids of rows other files point at are kept, so memory grows
+        # with users, posts and albums but not with comments or photos.
+        self.users, self.posts, self.albums = {}, {}, {}
+        self.truncated = 0
+        self.password = make_password(None)
+        self.max_lengths = {}
+        plans = {
+            'users': (User, self.build_user, self.users, lambda user: user.pk),
+            'posts': (Post, self.build_post, self.posts, lambda post: (post.pk, post.user_id)),
+            'comments': (Comment, self.build_comment, None, None),
+            'albums': (Album, self.build_album, self.albums, lambda album: (album.pk, album.user_id)),
+            'photos': (Photo, self.build_photo, None, None),
+            'todos': (Todo, self.build_todo, None, None),
+        }
+
+        started = time.perf_counter()
+        total = 0
+        with transaction.atomic(), deferred_invalidation():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    # Losing the import to a crash right after COPY is fine;
+                    # waiting for the WAL flush on every batch is not.
+                    cursor.execute('SET LOCAL synchronous_commit TO OFF')
+            check_constraints_immediately()
+            targets = [plans[resource][0] for resource in files]
+            dropped = self.drop_indexes(targets) if options['defer_indexes'] else []
+            for resource, path in files.items():
+                total += self.load(resource, path, *plans[resource], options['batch_size'])
+            self.rebuild_indexes(dropped)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Imported {total} rows in {elapsed:.2f}s ({rate(total, elapsed)}).'))
+        if self.truncated:
+            self.stdout.write(self.style.WARNING(f'{self.truncated} values were cut to their column length.'))
+
+    def find_files(self, directory):
+        if not directory.is_dir():
+            raise CommandError(f'{directory} is not a directory.')
+        files = {}
+        for resource in RESOURCES:
+            for suffix in SUFFIXES:
+                path = directory / f'{resource}{suffix}'
+                if path.exists():
+                    files[resource] = path
+                    break
+        if not files:
+            raise CommandError(f'No {", ".join(RESOURCES)} files found in {directory}.')
+        return files
+
+    def load(self, resource, path, model, build, ids, key, batch_size):
+        started = time.perf_counter()
+        rows = 0
+        batch, external_ids = [], []
+        try:
+            for record in iter_records(path):
+                try:
+                    batch.append(self.fit(build(record)))
+                except KeyError as exc:
+                    raise CommandError(f'{resource} {record.get("id")}: missing {exc}.')
+                external_ids.append(record.get('id'))
+                if len(batch) >= batch_size:
+                    rows += self.flush(model, batch, external_ids, ids, key)
+                    batch, external_ids = [], []
+        except ValueError as exc:
+            raise CommandError(f'{path}: {exc}')
+        rows += self.flush(model, batch, external_ids, ids, key)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'{resource}: {rows} rows in {elapsed:.2f}s ({rate(rows, elapsed)})')
+        return rows
+
+    def flush(self, model, batch, external_ids, ids, key):
+        load_objects(model, batch)
+        if ids is not None:
+            for external_id, obj in zip(external_ids, batch):
+                ids[external_id] = key(obj)
+        return len(batch)
+
+    def fit(self, obj):
+        model = type(obj)
+        if model not in self.max_lengths:
+            self.max_lengths[model] = [(field.attname, field.max_length) for field in model._meta.concrete_fields
+                                       if isinstance(field, models.CharField) and field.max_length]
+        for attname, max_length in self.max_lengths[model]:
+            value = getattr(obj, attname)
+            if isinstance(value, str) and len(value) > max_length:
+                setattr(obj, attname, value[:max_length])
+                self.truncated += 1
+        return obj
+
+    def parent(self, ids, record, name, resource):
+        try:
+            return ids[record[name]]
+        except KeyError:
+            raise CommandError(f'{resource} {record.get("id")}: unknown {name} {record.get(name)!r}.')
+
+    def build_user(self, record):
+        first_name, _, last_name = (record.get('name') or '').partition(' ')
+        address = record.get('address') or {}
+        geo = address.get('geo') or {}
+        return get_user_model()(
+            username=record['username'], email=record.get('email') or '', password=self.password,
+            first_name=first_name, last_name=last_name, street=address.get('street') or '',
+            suite=address.get('suite') or '', city=address.get('city') or '', zipcode=zipcode(address.get('zipcode')),
+            lat=number(geo.get('lat')), lng=number(geo.get('lng')), phone=record.get('phone') or '',
+            website=record.get('website'), company_name=(record.get('company') or {}).get('name') or '',
+        )
+
+    def build_post(self, record):
+        return Post(user_id=self.parent(self.users, record, 'userId', 'post'), title=record['title'],
+                    body=record['body'])
+
+    def build_comment(self, record):
+        post_id, owner_id = self.parent(self.posts, record, 'postId', 'comment')
+        return Comment(post_id=post_id, owner_id=owner_id, name=record['name'], email=record['email'],
+                       body=record['body'])
+
+    def build_album(self, record):
+        return Album(user_id=self.parent(self.users, record, 'userId', 'album'), title=record['title'])
+
+    def build_photo(self, record):
+        album_id, owner_id = self.parent(self.albums, record, 'albumId', 'photo')
+        return Photo(album_id=album_id, owner_id=owner_id, title=record['title'], url=record['url'],
+                     thumbnailUrl=record.get('thumbnailUrl'))
+
+    def build_todo(self, record):
+        return Todo(user_id=self.parent(self.users, record, 'userId', 'todo'), title=record['title'],
+                    completed=bool(record.get('completed')))
+
+    def drop_indexes(self, targets):
+        # Rebuilding an index once is far cheaper than maintaining it row by
+        # row, but only tables nobody else has rows in can go without them.
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING('--defer-indexes only applies to PostgreSQL; ignored.'))
+            return []
+        if any(model._base_manager.exists() for model in targets):
+            self.stdout.write(self.style.WARNING('Some tables already have rows; indexes are kept.'))
+            return []
+        dropped = [(model, index) for model in targets for index in model._meta.indexes]
+        with connection.schema_editor() as editor:
+            for model, index in dropped:
+                editor.remove_index(model, index)
+        return dropped
+
+    def rebuild_indexes(self, dropped):
+        if not dropped:
+            return
+        started = time.perf_counter()
+        with connection.schema_editor() as editor:
+            for model, index in dropped:
+                editor.add_index(model, index)
+        self.stdout.write(f'Rebuilt {len(dropped)} indexes in {time.perf_counter() - started:.2f}s')
@@ -0,0 +1,96 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from task_project.urls import router
+
+SEQUENTIAL_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    # SEARCH and SCAN ... USING (COVERING) INDEX lines use an index.
+    'sqlite': re.compile(r'\bSCAN (\w+)\b(?! USING)'),
+}
+
+
+class Command(BaseCommand):
+    help = ("Runs every router viewset's list queryset, and each of its filters, through EXPLAIN "
+            "as a given user and flags sequential scans.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username or id to audit as; defaults to the user with the most rows.')
+        parser.add_argument('--analyze', action='store_true', help='Use EXPLAIN ANALYZE (runs the queries).')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only flagged ones.')
+        parser.add_argument('--fail-on-seq-scan', action='store_true', help='Exit non-zero if anything is flagged.')
+
+    def handle(self, *args, **options):
+        pattern = SEQUENTIAL_SCAN.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'Unsupported database vendor {connection.vendor!r}.')
+        user = self.get_user(options['user'])
+        self.stdout.write(f'Auditing as {user} on {connection.vendor}')
+
+        flagged = 0
+        for prefix, viewset, basename in router.registry:
+            for params in self.variants(viewset, user):
+                label = f'/v1/{prefix}/' + (f'?{params}' if params else '')
+                queryset = self.list_queryset(viewset, user, prefix, params)
+                plan = queryset.explain(analyze=True) if options['analyze'] else queryset.explain()
+                scans = pattern.findall(plan)
+                if scans:
+                    flagged += 1
+                    self.stdout.write(self.style.WARNING(f'SEQ SCAN {label}: {", ".join(sorted(set(scans)))}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'ok       {label}'))
+                if scans or options['verbose_plans']:
+                    self.stdout.write(f'    {queryset.query}')
+                    self.stdout.write('    ' + plan.replace('\n', '\n    '))
+
+        if flagged:
+            self.stdout.write(self.style.WARNING(
+                f'{flagged} queries scan whole tables. Small tables are often scanned on purpose; '
+                f'audit against production-sized data before adding indexes.'
+            ))
+            if options['fail_on_seq_scan']:
+                raise CommandError('Sequential scans found.')
+
+    def get_user(self, identifier):
+        User = get_user_model()
+        if identifier:
+            lookup = {'pk': identifier} if identifier.isdigit() else {'username': identifier}
+            try:
+                return User.objects.get(**lookup)
+            except User.DoesNotExist:
+                raise CommandError(f'No user {identifier!r}.')
+        # The biggest photo owner exercises the largest per-user scans.
+        user = User.objects.annotate(rows=Count('albums__photos')).order_by('-rows', 'pk').first()
+        if user is None:
+            raise CommandError('There are no users to audit as.')
+        return user
+
+    def variants(self, viewset, user):
+        yield ''
+        for param, field_name in getattr(viewset, 'filter_params', {}).items():
+            view = self.make_view(viewset, user, '')
+            value = view.get_queryset().values_list(field_name, flat=True).first()
+            if value is not None:
+                yield f'{param}={str(value).lower() if isinstance(value, bool) else value}'
+
+    def make_view(self, viewset, user, params):
+        request = APIRequestFactory().get('/', data=dict(p.split('=', 1) for p in params.split('&') if p))
+        force_authenticate(request, user=user)
+        view = viewset(action_map={'get': 'list'}, args=(), kwargs={}, format_kwarg=None)
+        view.request = view.initialize_request(request)
+        return view
+
+    def list_queryset(self, viewset, user, prefix, params):
+        view = self.make_view(viewset, user, params)
+        request = view.request
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator = view.paginator
+        if paginator is None:
+            return queryset
+        ordering = paginator.get_ordering(request, queryset, view)
+        return queryset.order_by(*ordering)[:paginator.get_page_size(request)]
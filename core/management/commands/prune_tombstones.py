@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Tombstone, tombstone_retention
+
+
+class Command(BaseCommand):
+    help = ('Deletes tombstones older than TOMBSTONE_RETENTION. Sync tokens that old are refused, '
+            'so no change feed needs them any more.')
+
+    def handle(self, *args, **options):
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - tombstone_retention()).delete()
+        self.stdout.write(f'Pruned {deleted} tombstones.')
@@ -0,0 +1,127 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from core.cache import clear_caches
+from core.loading import check_constraints_immediately, copy_from, copy_to
+
+APPS = ('users', 'todos', 'content', 'media', 'core')
+MANIFEST = 'manifest.json'
+SQLITE_FILE = 'db.sqlite3'
+
+
+def snapshot_models():
+    # Users' group and permission links point at auth tables the snapshot
+    # does not hold, so they are left out with them.
+    return [model for app_label in APPS for model in apps.get_app_config(app_label).get_models()
+            if model._meta.managed and not model._meta.proxy]
+
+
+def referencing_models(models):
+    targets = set(models)
+    return [model for model in apps.get_models(include_auto_created=True)
+            if model not in targets and model._meta.managed and not model._meta.proxy
+            and any(field.related_model in targets for field in model._meta.concrete_fields if field.is_relation)]
+
+
+def table_columns(model):
+    return [field.column for field in model._meta.local_concrete_fields]
+
+
+class Command(BaseCommand):
+    help = ('Dumps the API tables to a snapshot directory, or restores one, so benchmark runs start from identical '
+            'data. PostgreSQL snapshots are COPY ... (FORMAT binary) files per table; SQLite ones copy the '
+            'database file with the backup API. Restoring replaces the current rows and clears the API caches.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=('dump', 'restore'))
+        parser.add_argument('path', help='Snapshot directory.')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        started = time.perf_counter()
+        if options['action'] == 'dump':
+            path.mkdir(parents=True, exist_ok=True)
+            rows, done = self.dump(path), 'Dumped'
+        else:
+            rows, done = self.restore(path, self.read_manifest(path)), 'Restored'
+            clear_caches()
+        self.stdout.write(self.style.SUCCESS(f'{done} {rows} rows in {time.perf_counter() - started:.2f}s.'))
+
+    def read_manifest(self, path):
+        try:
+            manifest = json.loads((path / MANIFEST).read_text())
+        except FileNotFoundError:
+            raise CommandError(f'{path} is not a snapshot.')
+        if manifest['vendor'] != connection.vendor:
+            raise CommandError(f'The snapshot was taken on {manifest["vendor"]}, not {connection.vendor}.')
+        return manifest
+
+    def dump(self, path):
+        models = snapshot_models()
+        manifest = {'vendor': connection.vendor, 'tables': {}}
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    # Every table is read from the same snapshot.
+                    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+            for model in models:
+                manifest['tables'][model._meta.db_table] = {'columns': table_columns(model),
+                                                            'rows': model._base_manager.count()}
+            if connection.vendor == 'postgresql':
+                for model in models:
+                    self.copy_table(model, path, 'TO STDOUT')
+        if connection.vendor != 'postgresql':
+            # SQLite copies the whole database page by page, far faster than
+            # reading it row by row.
+            destination = sqlite3.connect(path / SQLITE_FILE)
+            connection.connection.backup(destination)
+            destination.close()
+        (path / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        return sum(table['rows'] for table in manifest['tables'].values())
+
+    def restore(self, path, manifest):
+        models = snapshot_models()
+        tables = {model._meta.db_table: table_columns(model) for model in models}
+        saved = {table: details['columns'] for table, details in manifest['tables'].items()}
+        if saved != tables:
+            raise CommandError('The snapshot was taken with a different schema; migrate to match or dump again.')
+        if connection.vendor != 'postgresql':
+            connection.ensure_connection()
+            source = sqlite3.connect(path / SQLITE_FILE)
+            source.backup(connection.connection)
+            source.close()
+        else:
+            # TRUNCATE refuses tables other tables point at unless those are
+            # truncated too. Only empty ones are, so no row outside the
+            # snapshot is ever lost.
+            referencing = referencing_models(models)
+            used = [model._meta.db_table for model in referencing if model._base_manager.exists()]
+            if used:
+                raise CommandError(f'{", ".join(used)} reference the snapshot tables and have rows; '
+                                   f'empty them first.')
+            quote = connection.ops.quote_name
+            truncated = [*tables, *(model._meta.db_table for model in referencing)]
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f'TRUNCATE {", ".join(map(quote, truncated))}')
+                check_constraints_immediately()
+                # Parents come before their children in snapshot_models().
+                for model in models:
+                    self.copy_table(model, path, 'FROM STDIN')
+                for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+        return sum(details['rows'] for details in manifest['tables'].values())
+
+    def copy_table(self, model, path, direction):
+        quote = connection.ops.quote_name
+        columns = ', '.join(map(quote, table_columns(model)))
+        sql = f'COPY {quote(model._meta.db_table)} ({columns}) {direction} WITH (FORMAT binary)'
+        mode, copy = ('wb', copy_to) if direction == 'TO STDOUT' else ('rb', copy_from)
+        with open(path / f'{model._meta.db_table}.bin', mode) as file, connection.cursor() as cursor:
+            copy(cursor, sql, file)
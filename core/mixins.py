@@ -0,0 +1,352 @@
+import hashlib
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException, PermissionDenied, ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .cache import (
+    acquire_lock, cache_setting, get_entry, get_generation, get_timeout, make_key, make_latest_key, pack_entry,
+    query_fingerprint, release_lock, set_entry, should_refresh, unpack_entry,
+)
+from .filters import parse_value
+from .models import Tombstone, tombstone_retention
+from .serializers import (
+    EMBED_PARAM, EXCLUDE_PARAM, EXPAND_PARAM, FIELDS_PARAM, related_serializers, sync_cursor, sync_token,
+    wants_changes,
+)
+
+LOCK_POLL_INTERVAL = 0.05
+IDS_PARAM = 'ids'
+# Change feeds reread this much before the token, for writes that were
+# stamped before it was issued but committed after.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def rendered_content_type(request):
+    charset = request.accepted_renderer.charset
+    media_type = request.accepted_media_type
+    return f'{media_type}; charset={charset}' if charset else media_type
+
+
+class SyncTokenExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'This sync token has expired; fetch the full list again.'
+    default_code = 'sync_token_expired'
+
+
+def conditional_headers(response, etag, tier=None):
+    if tier is not None:
+        response['X-Cache'] = tier
+    if etag is not None:
+        response['ETag'] = etag
+    patch_vary_headers(response, ['Accept'])
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class CachedListMixin:
+    cache_resource = None
+    cached_headers = ('Link',)
+    unordered_query_params = (FIELDS_PARAM, EXCLUDE_PARAM, EMBED_PARAM, EXPAND_PARAM)
+    # Only renderers whose output depends on nothing but the data are cached;
+    # the browsable API embeds per-request forms and tokens.
+    cached_renderer_formats = ('json',)
+
+    def get_cache_owner(self):
+        return self.request.user.pk
+
+    def get_cache_parts(self):
+        request = self.request
+        parts = [self.action]
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if lookup is not None:
+            parts.append(lookup)
+        parts.append(request.accepted_renderer.format)
+        parts.append(query_fingerprint(request.query_params, request.accepted_media_type,
+                                       self.unordered_query_params))
+        return parts
+
+    def get_related_parts(self, serializer_class, owner_id):
+        # Embedded and expanded rows belong to other resources, so their
+        # generations are part of the key too.
+        parts = []
+        for related, _ in related_serializers(serializer_class, self.request).values():
+            model = related.Meta.model
+            scope = owner_id if model.cache_owner_path is not None else None
+            parts.append(f'{model.cache_resource}.g{get_generation(model.cache_resource, scope)}')
+        return sorted(parts)
+
+    def get_cache_key(self, resource, owner_id, *parts):
+        return make_key(resource, owner_id, *self.get_cache_parts(), *parts)
+
+    def cached_body_response(self, body, headers, etag, tier):
+        response = HttpResponse(body, content_type=rendered_content_type(self.request), headers=headers)
+        return conditional_headers(response, etag, tier)
+
+    def wait_for_entry(self, cache_key, resource):
+        deadline = time.monotonic() + cache_setting(resource, 'LOCK_WAIT')
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry, _ = get_entry(resource, cache_key)
+            if entry is not None:
+                return entry
+        return None
+
+    def cached_response(self, resource, owner_id, build, serializer_class=None):
+        request = self.request
+        if request.accepted_renderer.format not in self.cached_renderer_formats:
+            return build()
+
+        related_parts = self.get_related_parts(serializer_class or self.get_serializer_class(), owner_id)
+        cache_key = self.get_cache_key(resource, owner_id, *related_parts)
+        # The key already pins the owner's generation and the exact variant,
+        # so it identifies the representation without rendering it.
+        etag = quote_etag(hashlib.md5(cache_key.encode()).hexdigest())
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return conditional_headers(HttpResponseNotModified(), etag)
+
+        lock_timeout = cache_setting(resource, 'LOCK_TIMEOUT')
+        stale_across_writes = cache_setting(resource, 'STALE_ACROSS_WRITES')
+        latest_key = make_latest_key(resource, owner_id, *self.get_cache_parts(), *related_parts) if stale_across_writes else None
+
+        entry, tier = get_entry(resource, cache_key)
+        if entry is not None:
+            body, expiry, delta, headers = unpack_entry(entry)
+            beta = cache_setting(resource, 'EARLY_REFRESH_BETA')
+            # Whoever loses the race for the refresh lock keeps serving the
+            # current entry until the winner has replaced it.
+            if not should_refresh(expiry, delta, beta) or not acquire_lock(cache_key, lock_timeout):
+                return self.cached_body_response(body, headers, etag, tier)
+            locked = True
+        else:
+            locked = acquire_lock(cache_key, lock_timeout)
+            if not locked:
+                if latest_key is not None:
+                    entry = cache.get(latest_key)
+                    if entry is not None:
+                        body, _, _, headers = unpack_entry(entry)
+                        return self.cached_body_response(body, headers, None, 'stale')
+                entry = self.wait_for_entry(cache_key, resource)
+                if entry is not None:
+                    body, _, _, headers = unpack_entry(entry)
+                    return self.cached_body_response(body, headers, etag, 'shared')
+
+        started = time.perf_counter()
+        try:
+            response = build()
+        except Exception:
+            if locked:
+                release_lock(cache_key)
+            raise
+
+        def store(rendered):
+            try:
+                if rendered.status_code == status.HTTP_200_OK:
+                    timeout = get_timeout(resource)
+                    grace = cache_setting(resource, 'STALE_GRACE')
+                    headers = {name: rendered[name] for name in self.cached_headers if name in rendered}
+                    entry = pack_entry(rendered.content, timeout, time.perf_counter() - started, headers)
+                    set_entry(resource, cache_key, entry, timeout + grace)
+                    if latest_key is not None:
+                        cache.set(latest_key, entry, timeout=timeout + grace)
+            finally:
+                if locked:
+                    release_lock(cache_key)
+
+        response.add_post_render_callback(store)
+        # Errors are not cached, so they carry no validator to revalidate.
+        return conditional_headers(response, etag if response.status_code == status.HTTP_200_OK else None, 'miss')
+
+    def changes_response(self, queryset, owner_id):
+        # With ?since=, a list returns the rows changed after the token and
+        # the ids that left the owner's scope, uncached. The feed costs a
+        # range scan on (owner, updated_at) and on tombstones. Rows come in
+        # (updated_at, pk) order, at most a page at a time; while more is
+        # true the token resumes the same pass, and the ids that left are
+        # sent with its last page.
+        cursor = sync_cursor(self.request)
+        now = timezone.now()
+        started = cursor.started or now
+        tombstones = Tombstone.objects.none()
+        if cursor.since is not None:
+            if cursor.since < now - tombstone_retention():
+                raise SyncTokenExpired()
+            since = cursor.since - SYNC_OVERLAP
+            queryset = queryset.filter(updated_at__gte=since)
+            tombstones = Tombstone.objects.filter(resource=queryset.model.cache_resource, owner_id=owner_id,
+                                                  deleted_at__gte=since)
+        changed = queryset.order_by('updated_at', 'pk')
+        if cursor.after is not None:
+            updated_at, pk = cursor.after
+            changed = changed.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=pk))
+        limit = self.paginator.get_page_size(self.request) if self.paginator is not None else None
+        rows = list(changed[:limit + 1] if limit else changed)
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            return Response({
+                'changed': self.get_serializer(rows, many=True).data,
+                'deleted': [],
+                'token': sync_token(started, (cursor.since, (last.updated_at, last.pk))),
+                'more': True,
+            })
+        deleted = set(tombstones.values_list('object_id', flat=True))
+        if deleted and cursor.after is not None:
+            # Rows sent on earlier pages are back in scope too.
+            deleted -= set(queryset.filter(pk__in=deleted).values_list('pk', flat=True))
+        deleted -= {row.pk for row in rows}
+        return Response({
+            'changed': self.get_serializer(rows, many=True).data,
+            'deleted': sorted(deleted),
+            # Writes made while the pass was paged are read again next time.
+            'token': sync_token(started),
+            'more': False,
+        })
+
+    def get_parent(self):
+        # A nested action's query parameters are meant for the child list, so
+        # the parent is looked up without this view's filters.
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        parent = get_object_or_404(self.get_queryset(), **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(self.request, parent)
+        return parent
+
+    def nested_view(self, view_class):
+        return view_class(request=self.request, args=(), kwargs={}, format_kwarg=self.format_kwarg, action='list')
+
+    def nested_list(self, view_class, queryset):
+        # Nested actions list a child resource restricted to one parent, so
+        # they reuse the child viewset's filters, pagination and serializer.
+        view = self.nested_view(view_class)
+        queryset = view.filter_queryset(queryset)
+        page = view.paginate_queryset(queryset)
+        if page is None:
+            return Response(view.get_serializer(queryset, many=True).data)
+        return view.get_paginated_response(view.get_serializer(page, many=True).data)
+
+    def nested_response(self, view_class, owner_id, queryset):
+        if wants_changes(self.request):
+            view = self.nested_view(view_class)
+            return view.changes_response(view.filter_queryset(queryset), owner_id)
+        return self.cached_response(view_class.cache_resource, owner_id,
+                                    lambda: self.nested_list(view_class, queryset), view_class.serializer_class)
+
+    def list(self, request, *args, **kwargs):
+        if wants_changes(request):
+            return self.changes_response(self.filter_queryset(self.get_queryset()), self.get_cache_owner())
+        return self.cached_response(self.cache_resource, self.get_cache_owner(),
+                                    lambda: super(CachedListMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        # The row is looked up first, so a missing or foreign id is a 404
+        # even for a client sending If-None-Match: *.
+        instance = self.get_object()
+        return self.cached_response(self.cache_resource, self.get_cache_owner(),
+                                    lambda: Response(self.get_serializer(instance).data))
+
+
+class BulkCreateMixin:
+    """Accepts a JSON array on create and inserts it as one batch.
+
+    Items are validated together and any error fails the whole batch, listed
+    per item. ``owned_parent_field`` names the foreign key whose row must
+    belong to the requesting user; ``owner_field`` names the one every item
+    is saved with the requesting user in.
+    """
+
+    owned_parent_field = None
+    owned_parent_message = None
+    owner_field = None
+    bulk_max_items = 1000
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data, many=True, max_length=self.bulk_max_items)
+        serializer.is_valid(raise_exception=True)
+        self.check_bulk_parents(serializer.validated_data)
+        self.perform_bulk_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def check_bulk_parents(self, items):
+        name = self.owned_parent_field
+        if name is None:
+            return
+        # The parents were fetched in one query during validation, so their
+        # owner is already at hand.
+        owner_column = self.get_serializer_class().Meta.model._meta.get_field(name).related_model.cache_owner_path
+        user_id = self.request.user.pk
+        errors = [{} if getattr(attrs[name], owner_column) == user_id else {name: [self.owned_parent_message]}
+                  for attrs in items]
+        if any(errors):
+            raise PermissionDenied(errors)
+
+    def perform_bulk_create(self, serializer):
+        if self.owner_field is None:
+            serializer.save()
+        else:
+            serializer.save(**{self.owner_field: self.request.user})
+
+
+class BulkQuerysetMixin:
+
+    def get_bulk_queryset(self):
+        # The same scoping and filters as a list, optionally narrowed to
+        # ``?ids=``, so a bulk write can only reach rows the user could list.
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        values = [value for param in self.request.query_params.getlist(IDS_PARAM)
+                  for value in param.split(',') if value.strip()]
+        if values:
+            try:
+                ids = [parse_value(queryset.model._meta.pk, value.strip()) for value in values]
+            except ValidationError as exc:
+                raise ValidationError({IDS_PARAM: exc.detail})
+            queryset = queryset.filter(pk__in=ids)
+        return queryset
+
+
+class BulkUpdateMixin(BulkQuerysetMixin):
+    """``PATCH`` on the collection applies the body to every selected row.
+
+    The body is validated like a partial update and may only touch
+    ``bulk_update_fields``; the rows are changed by a single UPDATE.
+    """
+
+    bulk_update_fields = ()
+
+    def bulk_update(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        values = serializer.validated_data
+        fixed = {name: ['This field cannot be updated in bulk.'] for name in values
+                 if name not in self.bulk_update_fields}
+        if fixed:
+            raise ValidationError(fixed)
+        if not values:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: ['No fields to update.']})
+        updated = self.get_bulk_queryset().update(**values)
+        return Response({'updated': updated})
+
+
+class BulkDestroyMixin(BulkQuerysetMixin):
+    """``DELETE`` on the collection removes the selected rows at once.
+
+    ``?ids=`` is required, so a bare DELETE can never empty the collection.
+    """
+
+    def bulk_destroy(self, request, *args, **kwargs):
+        if not request.query_params.getlist(IDS_PARAM):
+            raise ValidationError({IDS_PARAM: ['This parameter is required.']})
+        deleted, _ = self.get_bulk_queryset().delete()
+        return Response({'deleted': deleted})
@@ -0,0 +1,293 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .cache import deferred_invalidation, invalidate
+
+
+def parent_field(model):
+    hop = model.cache_owner_path.split('__')[0]
+    return model._meta.get_field(hop)
+
+
+def owners_for_parents(model, parent_ids):
+    path = model.cache_owner_path
+    if path is None:
+        return {None}
+    rest = path.partition('__')[2]
+    if not rest:
+        return set(parent_ids)
+    related = parent_field(model).related_model
+    return set(related._base_manager.filter(pk__in=parent_ids).values_list(rest, flat=True))
+
+
+def owners_of(model, instances):
+    if model.cache_owner_path is None:
+        return {None}
+    attname = parent_field(model).attname
+    return owners_for_parents(model, {getattr(instance, attname) for instance in instances})
+
+
+def owner_rows(queryset):
+    path = queryset.model.cache_owner_path
+    if path is None:
+        return [(pk, None) for pk in queryset.order_by().values_list('pk', flat=True)]
+    return list(queryset.order_by().values_list('pk', path))
+
+
+def tombstone_retention():
+    return getattr(settings, 'TOMBSTONE_RETENTION', timedelta(days=30))
+
+
+_burials = ContextVar('deferred_burials', default=None)
+
+
+def bury(model, rows):
+    tombstones = [Tombstone(resource=model.cache_resource, owner_id=owner_id, object_id=pk) for pk, owner_id in rows]
+    pending = _burials.get()
+    if pending is not None:
+        pending.extend(tombstones)
+        return
+    Tombstone.objects.bulk_create(tombstones)
+
+
+@contextmanager
+def deferred_deletion(using):
+    # Django's collector deletes a row and all it cascades to one signal at a
+    # time. Inside this block their tombstones are written in one INSERT and
+    # each owner's resources are invalidated once, in the same transaction.
+    if _burials.get() is not None:
+        yield
+        return
+    pending = []
+    with transaction.atomic(using=using), deferred_invalidation():
+        token = _burials.set(pending)
+        try:
+            yield
+        finally:
+            _burials.reset(token)
+        Tombstone.objects.using(using).bulk_create(pending)
+
+
+def bury_departed(model, before):
+    # A row whose owner changed is gone from the previous owner's change feed
+    # just as if it had been deleted.
+    after = dict(owner_rows(model._base_manager.filter(pk__in=list(before))))
+    bury(model, [(pk, owner_id) for pk, owner_id in before.items() if after.get(pk, owner_id) != owner_id])
+    return set(after.values())
+
+
+def source_field(model):
+    return model._meta.get_field(model.owner_source.split('__')[0])
+
+
+def owner_subquery(model):
+    field = source_field(model)
+    column = model.owner_source.partition('__')[2]
+    parents = field.related_model._base_manager.filter(pk=OuterRef(field.attname))
+    return Subquery(parents.values(column)[:1])
+
+
+def assign_owners(model, objs):
+    field = source_field(model)
+    column = model.owner_source.partition('__')[2]
+    pending = []
+    for obj in objs:
+        parent = field.get_cached_value(obj, None)
+        if parent is not None and parent.pk == getattr(obj, field.attname):
+            obj.owner_id = getattr(parent, column)
+        else:
+            pending.append(obj)
+    if pending:
+        parent_ids = {getattr(obj, field.attname) for obj in pending}
+        owners = dict(field.related_model._base_manager.filter(pk__in=parent_ids).values_list('pk', column))
+        for obj in pending:
+            obj.owner_id = owners.get(getattr(obj, field.attname))
+
+
+def owned_children(model):
+    return [child for child in apps.get_models()
+            if issubclass(child, OwnedModel) and source_field(child).related_model is model]
+
+
+def sync_children(model, pks):
+    # Rows of other models that copy this one's owner follow it in one UPDATE
+    # each, which also invalidates them for the old and the new owner.
+    for child in owned_children(model):
+        lookup = f'{source_field(child).name}__in'
+        child.objects.filter(**{lookup: pks}).update(owner_id=owner_subquery(child))
+
+
+class VersionedQuerySet(models.QuerySet):
+
+    def _owner_ids(self):
+        path = self.model.cache_owner_path
+        if path is None:
+            return {None}
+        return set(self.order_by().values_list(path, flat=True).distinct())
+
+    def _moves_owner(self, kwargs):
+        if self.model.cache_owner_path is None:
+            return False
+        field = parent_field(self.model)
+        return field.name in kwargs or field.attname in kwargs
+
+    def _moves_source(self, kwargs):
+        if not issubclass(self.model, OwnedModel):
+            return False
+        field = source_field(self.model)
+        return field.name in kwargs or field.attname in kwargs
+
+    def update(self, **kwargs):
+        model = self.model
+        kwargs.setdefault('updated_at', timezone.now())
+        owners = self._owner_ids()
+        moves_owner = self._moves_owner(kwargs)
+        moves_source = self._moves_source(kwargs)
+        if moves_owner or moves_source:
+            before = dict(owner_rows(self))
+            pks = list(before)
+        rows = super().update(**kwargs)
+        if not rows:
+            return rows
+        if moves_source:
+            model._base_manager.filter(pk__in=pks).update(owner_id=owner_subquery(model))
+        if moves_owner or moves_source:
+            owners |= bury_departed(model, before)
+            sync_children(model, pks)
+            for dependent in model.cache_dependents:
+                invalidate(dependent, owners)
+        invalidate(model.cache_resource, owners)
+        return rows
+
+    def delete(self):
+        model = self.model
+        cascades = any(rel.on_delete is not models.DO_NOTHING for rel in model._meta.related_objects)
+        if cascades:
+            with deferred_deletion(self.db):
+                return super().delete()
+        if self.query.is_sliced or self.query.distinct or self._fields is not None:
+            # The collector rejects these.
+            return super().delete()
+        # Nothing depends on these rows, so one DELETE replaces the collector's
+        # SELECT and per-row signals, and the owners are invalidated once.
+        with transaction.atomic(using=self.db, savepoint=False):
+            deleting = owner_rows(self)
+            bury(model, deleting)
+            rows = model._base_manager.filter(pk__in=[pk for pk, _ in deleting])._raw_delete(self.db)
+        if rows:
+            invalidate(model.cache_resource, {owner_id for _, owner_id in deleting})
+        return rows, {model._meta.label: rows}
+
+    def bulk_create(self, objs, *args, **kwargs):
+        if issubclass(self.model, OwnedModel):
+            objs = list(objs)
+            assign_owners(self.model, [obj for obj in objs if obj.owner_id is None])
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            invalidate(self.model.cache_resource, owners_of(self.model, objs))
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        moves_source = self._moves_source(dict.fromkeys(fields))
+        if moves_source:
+            assign_owners(self.model, objs)
+            fields.append('owner')
+        moves_owner = moves_source or self._moves_owner(dict.fromkeys(fields))
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        if 'updated_at' not in fields:
+            fields.append('updated_at')
+        pks = [obj.pk for obj in objs]
+        if moves_owner:
+            before = dict(owner_rows(self.filter(pk__in=pks)))
+            owners = set(before.values())
+        else:
+            owners = self.filter(pk__in=pks)._owner_ids()
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        if rows:
+            owners |= owners_of(self.model, objs)
+            if moves_owner:
+                bury_departed(self.model, before)
+                sync_children(self.model, pks)
+            invalidate(self.model.cache_resource, owners)
+        return rows
+
+
+class VersionedModel(models.Model):
+    # Name of the cache generation bumped whenever a row changes, the lookup
+    # path from a row to the id of the user owning it (None for rows shared
+    # by everyone), and the resources whose rows are scoped through this one.
+    cache_resource = None
+    cache_owner_path = None
+    cache_dependents = ()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = VersionedQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields:
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
+        super().save(*args, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        with deferred_deletion(using or router.db_for_write(type(self), instance=self)):
+            return super().delete(using=using, keep_parents=keep_parents)
+
+
+class OwnedModel(VersionedModel):
+    # Rows that belong to a user only through their parent keep a copy of
+    # that user's id, so scoping them never joins the parent. owner_source is
+    # '<parent field>__<owner column on the parent>'.
+    owner_source = None
+    cache_owner_path = 'owner_id'
+
+    # Subclasses index (owner, ...) themselves, so the foreign key's own
+    # single-column index would only add write cost.
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+',
+                              editable=False, db_index=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        field = source_field(type(self))
+        parent_id = getattr(self, field.attname)
+        if self.owner_id is None or parent_id != self.__dict__.get('_owner_parent_id'):
+            assign_owners(type(self), [self])
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'owner'}
+        self._owner_parent_id = parent_id
+        super().save(*args, **kwargs)
+
+
+class Tombstone(models.Model):
+    """Remembers that a row left an owner's scope, by deletion or by moving to
+    another owner, so change feeds can report it."""
+
+    resource = models.CharField(max_length=50)
+    owner_id = models.BigIntegerField(null=True)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['resource', 'owner_id', 'deleted_at'], name='tombstone_feed_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ]
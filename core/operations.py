@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from functools import partial
+
+from django.db import NotSupportedError
+from django.db.migrations.operations import AddIndex, RemoveIndex
+
+
+@contextmanager
+def concurrently(schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        yield
+        return
+    if connection.in_atomic_block:
+        raise NotSupportedError('Concurrent index operations need a migration with atomic = False.')
+    schema_editor.add_index = partial(type(schema_editor).add_index, schema_editor, concurrently=True)
+    schema_editor.remove_index = partial(type(schema_editor).remove_index, schema_editor, concurrently=True)
+    try:
+        yield
+    finally:
+        del schema_editor.add_index
+        del schema_editor.remove_index
+
+
+class ConcurrentIndexMixin:
+    """Builds and drops the index CONCURRENTLY on PostgreSQL so writes aren't
+    blocked while it runs; other databases use the plain statement."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        with concurrently(schema_editor):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        with concurrently(schema_editor):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        description = super().describe()
+        return f'Concurrently {description[0].lower()}{description[1:]}'
+
+
+class AddIndexConcurrently(ConcurrentIndexMixin, AddIndex):
+    pass
+
+
+class RemoveIndexConcurrently(ConcurrentIndexMixin, RemoveIndex):
+    pass
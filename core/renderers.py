@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+from collections import namedtuple
+from itertools import islice
+
+from django.db import connections
+from django.db.models import BooleanField, TextField, Value
+from django.db.models.functions import Cast
+from rest_framework.renderers import BaseRenderer
+
+EXPORT_CHUNK_SIZE = 2000
+
+# fields maps each exported name to the model column holding it.
+ExportSection = namedtuple('ExportSection', 'name queryset fields')
+
+
+def chunked_rows(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    # Rows come from a server-side cursor where the database has one, as
+    # tuples rather than model instances, and leave in chunks.
+    rows = queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+def supports_copy(queryset):
+    if connections[queryset.db].vendor != 'postgresql':
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    # psycopg 3 streams COPY output block by block; psycopg2 can only copy
+    # into a file, which would hold the whole export.
+    return is_psycopg3
+
+
+def copy_csv(section):
+    model = section.queryset.model
+    columns = [Cast(column, TextField()) if isinstance(model._meta.get_field(column), BooleanField) else column
+               for column in section.fields.values()]
+    queryset = section.queryset.values_list(Value(section.name), *columns)
+    sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    with connections[queryset.db].cursor() as cursor:
+        with cursor.cursor.copy(f'COPY ({sql}) TO STDOUT WITH (FORMAT csv)', params) as copy:
+            for block in copy:
+                yield bytes(block)
+
+
+class StreamingRenderer(BaseRenderer):
+    """Negotiates the format of a streamed export.
+
+    Subclasses stream the body through ``stream(sections)``; ``render()`` is
+    only used for error responses, which stay JSON.
+    """
+
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b'' if data is None else json.dumps(data).encode()
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def stream(self, sections):
+        for section in sections:
+            names = ('type', *section.fields)
+            for chunk in chunked_rows(section.queryset, section.fields.values()):
+                yield ''.join(json.dumps(dict(zip(names, (section.name, *row)))) + '\n' for row in chunk).encode()
+
+
+class CSVRenderer(StreamingRenderer):
+    """Writes every section as a header row followed by its rows, the first
+    column naming the section. On PostgreSQL with psycopg 3 the rows come
+    straight from ``COPY ... TO STDOUT``."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, sections):
+        for section in sections:
+            yield self.encode([('type', *section.fields)])
+            if supports_copy(section.queryset):
+                yield from copy_csv(section)
+                continue
+            for chunk in chunked_rows(section.queryset, section.fields.values()):
+                yield self.encode((section.name, *map(self.encode_value, row)) for row in chunk)
+
+    def encode(self, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(rows)
+        return buffer.getvalue().encode()
+
+    def encode_value(self, value):
+        # Matches what COPY writes for a boolean cast to text.
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        return value
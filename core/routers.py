@@ -0,0 +1,18 @@
+from rest_framework.routers import DefaultRouter
+
+
+class BulkRouter(DefaultRouter):
+    """Routes PATCH and DELETE on a collection to its bulk actions.
+
+    Viewsets only get the methods whose actions they implement, so the
+    collection URL of a viewset without bulk mixins is unchanged.
+    """
+
+    routes = [
+        DefaultRouter.routes[0]._replace(mapping={
+            **DefaultRouter.routes[0].mapping,
+            'patch': 'bulk_update',
+            'delete': 'bulk_destroy',
+        }),
+        *DefaultRouter.routes[1:],
+    ]
@@ -0,0 +1,307 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+from rest_framework import serializers
+from rest_framework.fields import IntegerField
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.serializers import ListSerializer
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+EMBED_PARAM = '_embed'
+EXPAND_PARAM = '_expand'
+PREVIEW_PARAM = 'preview'
+MAX_PREVIEW = 50
+MAX_BATCH = 20
+MAX_CHANGESET = 500
+SINCE_PARAM = 'since'
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# since is where the pass reads from, started when it began and after the
+# (updated_at, pk) of the last row already sent, if any.
+SyncCursor = namedtuple('SyncCursor', 'since started after')
+
+
+def split_param(request, name):
+    value = request.query_params.get(name, '') if request is not None else ''
+    return {field.strip() for field in value.split(',') if field.strip()}
+
+
+def requested_relations(request, param):
+    if request is None or request.method not in SAFE_METHODS:
+        return set()
+    return {name.strip() for value in request.query_params.getlist(param)
+            for name in value.split(',') if name.strip()}
+
+
+def preview_size(request):
+    if request is None or request.method not in SAFE_METHODS or PREVIEW_PARAM not in request.query_params:
+        return None
+    field = IntegerField(min_value=1, max_value=MAX_PREVIEW)
+    try:
+        return field.run_validation(request.query_params[PREVIEW_PARAM])
+    except ValidationError as exc:
+        raise ValidationError({PREVIEW_PARAM: exc.detail})
+
+
+def wants_changes(request):
+    return request is not None and request.method in SAFE_METHODS and SINCE_PARAM in request.query_params
+
+
+def to_micros(moment):
+    return 0 if moment is None else (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(value):
+    return None if value == 0 else EPOCH + timedelta(microseconds=value)
+
+
+def sync_token(started, resume=None):
+    # A token is the moment a pass started. A pass cut into pages also
+    # carries its own since and the (updated_at, pk) of the last row sent.
+    values = [to_micros(started)]
+    if resume is not None:
+        since, (updated_at, pk) = resume
+        values += [to_micros(since), to_micros(updated_at), pk]
+    raw = b''.join(value.to_bytes(8, 'big') for value in values)
+    return urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def sync_cursor(request):
+    # An empty token asks for everything, which is how a client gets its
+    # first token.
+    token = request.query_params[SINCE_PARAM]
+    if not token:
+        return SyncCursor(None, None, None)
+    try:
+        raw = urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        if len(raw) not in (8, 32):
+            raise ValueError(token)
+        values = [int.from_bytes(raw[start:start + 8], 'big') for start in range(0, len(raw), 8)]
+        if len(values) == 1:
+            return SyncCursor(from_micros(values[0]), None, None)
+        started, since, updated_at, pk = values
+        return SyncCursor(from_micros(since), from_micros(started), (from_micros(updated_at), pk))
+    except (binascii.Error, ValueError, OverflowError):
+        raise ValidationError({SINCE_PARAM: ['Invalid sync token.']})
+
+
+def preview_attr(name):
+    return f'{name}_preview'
+
+
+def related_serializers(serializer_class, request):
+    # Maps each relation the request embeds or expands, and the serializer
+    # class declares, to the serializer rendering it and whether it is a list.
+    related = {}
+    for param, declared, many in ((EMBED_PARAM, 'embeddable', True), (EXPAND_PARAM, 'expandable', False)):
+        relations = getattr(serializer_class, declared, {})
+        for name in requested_relations(request, param) & relations.keys():
+            related[name] = (import_string(relations[name]), many)
+    preview = getattr(serializer_class, 'preview', None)
+    if preview is not None and preview_size(request) is not None:
+        name = preview[0]
+        related[name] = (import_string(serializer_class.embeddable[name]), True)
+    return related
+
+
+def is_nested(serializer):
+    parent = serializer.parent
+    while parent is not None:
+        if not isinstance(parent, ListSerializer):
+            return True
+        parent = parent.parent
+    return False
+
+
+def wants_sparse_fieldset(request):
+    return (request is not None and request.method in SAFE_METHODS
+            and bool(split_param(request, FIELDS_PARAM) or split_param(request, EXCLUDE_PARAM)))
+
+
+class SparseFieldsetMixin:
+    """Honours ``?fields=`` and ``?exclude=`` on reads.
+
+    ``sparse_sources`` lists the model columns behind fields that are not
+    plain model fields, so the queryset can be narrowed to match.
+    """
+
+    sparse_sources = {}
+
+    @cached_property
+    def _readable_fields(self):
+        # Resolved once per serializer; with many=True the child instance is
+        # shared by every row.
+        fields = list(super()._readable_fields)
+        request = self.context.get('request')
+        if not wants_sparse_fieldset(request) or is_nested(self):
+            return fields
+        wanted = split_param(request, FIELDS_PARAM)
+        unwanted = split_param(request, EXCLUDE_PARAM)
+        # Embedded and expanded relations were asked for explicitly.
+        related = related_serializers(type(self), request).keys()
+        return [
+            field for field in fields
+            if field.field_name in related
+            or ((not wanted or field.field_name in wanted) and field.field_name not in unwanted)
+        ]
+
+    def sparse_columns(self):
+        model = self.Meta.model
+        columns = set()
+        for field in self._readable_fields:
+            if field.field_name in self.sparse_sources:
+                columns.update(self.sparse_sources[field.field_name])
+                continue
+            source = field.source.split('.')[0]
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                return None
+            if model_field.is_relation and not model_field.concrete:
+                # Reverse relations are prefetched by primary key.
+                continue
+            columns.add(source)
+        return columns
+
+
+class EmbedMixin:
+    """Adds the relations named in ``?_embed=`` and ``?_expand=`` to reads.
+
+    ``embeddable`` maps a reverse relation to the dotted path of the
+    serializer listing its rows, ``expandable`` does the same for a foreign
+    key. ``preview`` names an embeddable relation and its ordering;
+    ``?preview=N`` embeds only the first N rows of it per parent. Only the
+    outermost serializer embeds, so nesting never recurses.
+    """
+
+    embeddable = {}
+    expandable = {}
+    preview = None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if is_nested(self):
+            return fields
+        request = self.context.get('request')
+        previewed = self.preview[0] if self.preview is not None and preview_size(request) is not None else None
+        for name, (serializer_class, many) in related_serializers(type(self), request).items():
+            # Previews are prefetched into their own attribute, because a
+            # sliced queryset cannot stand in for the whole relation.
+            kwargs = {'source': preview_attr(name)} if name == previewed else {}
+            fields[name] = serializer_class(many=many, read_only=True, **kwargs)
+        return fields
+
+
+class BatchedPrimaryKeyRelatedField(PrimaryKeyRelatedField):
+    """A primary key field that a list serializer can resolve in one query.
+
+    ``resolve()`` fetches every id of a batch with a single ``IN`` query;
+    until ``release()``, items are looked up there and missing ids fail
+    without touching the database.
+    """
+
+    resolved = None
+
+    def normalize(self, value):
+        if self.pk_field is not None:
+            value = self.pk_field.to_internal_value(value)
+        if isinstance(value, bool):
+            raise TypeError
+        try:
+            return self.get_queryset().model._meta.pk.to_python(value)
+        except DjangoValidationError:
+            raise ValueError
+
+    def resolve(self, values):
+        keys = set()
+        for value in values:
+            try:
+                keys.add(self.normalize(value))
+            except (TypeError, ValueError, ValidationError):
+                continue
+        self.resolved = self.get_queryset().in_bulk(keys)
+
+    def release(self):
+        self.resolved = None
+
+    def to_internal_value(self, data):
+        if self.resolved is None:
+            return super().to_internal_value(data)
+        try:
+            key = self.normalize(data)
+        except (TypeError, ValueError):
+            # Left to the regular lookup, which words the error.
+            return super().to_internal_value(data)
+        if key not in self.resolved:
+            self.fail('does_not_exist', pk_value=data)
+        return self.resolved[key]
+
+
+class BulkListSerializer(ListSerializer):
+    """Creates a list payload with one ``bulk_create`` in one transaction.
+
+    Batched primary key fields of the child are resolved for the whole
+    payload before the items are validated.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or (self.max_length is not None and len(data) > self.max_length):
+            return super().to_internal_value(data)
+        fields = [field for field in self.child.fields.values()
+                  if isinstance(field, BatchedPrimaryKeyRelatedField) and not field.read_only]
+        for field in fields:
+            field.resolve(item[field.field_name] for item in data
+                          if isinstance(item, dict) and field.field_name in item)
+        try:
+            return super().to_internal_value(data)
+        finally:
+            for field in fields:
+                field.release()
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objs = [model(**attrs) for attrs in validated_data]
+        with transaction.atomic():
+            return model.objects.bulk_create(objs)
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'], default='GET')
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False)
+    headers = serializers.DictField(child=serializers.CharField(), required=False)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchRequestSerializer(many=True, allow_empty=False, max_length=MAX_BATCH)
+    concurrent = serializers.BooleanField(default=False)
+
+
+class OperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['create', 'update', 'delete'])
+    resource = serializers.CharField()
+    id = serializers.JSONField(required=False)
+    ref = serializers.CharField(required=False)
+    data = serializers.DictField(required=False, default=dict)
+
+    def validate(self, attrs):
+        if attrs['op'] == 'create' and 'id' in attrs:
+            raise ValidationError({'id': ['Created rows get their id from the database.']})
+        if attrs['op'] != 'create' and 'id' not in attrs:
+            raise ValidationError({'id': ['This field is required.']})
+        if attrs['op'] != 'create' and 'ref' in attrs:
+            raise ValidationError({'ref': ['Only created rows can be referenced.']})
+        return attrs
+
+
+class ChangesetSerializer(serializers.Serializer):
+    operations = OperationSerializer(many=True, allow_empty=False, max_length=MAX_CHANGESET)
@@ -0,0 +1,58 @@
+from django.apps import apps
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_init, post_save
+
+from . import local
+from .cache import invalidate
+from .models import (OwnedModel, VersionedModel, bury, owners_for_parents, owners_of, parent_field, source_field,
+                     sync_children)
+
+
+def _parent_id(instance):
+    # Deferred columns are skipped so that loading a row never costs a query.
+    return instance.__dict__.get(parent_field(type(instance)).attname)
+
+
+def remember_parent(sender, instance, **kwargs):
+    if sender.cache_owner_path is not None:
+        instance._cache_parent_id = _parent_id(instance)
+    if issubclass(sender, OwnedModel):
+        instance._owner_parent_id = instance.__dict__.get(source_field(sender).attname)
+
+
+def invalidate_saved(sender, instance, created, **kwargs):
+    owners = owners_of(sender, [instance])
+    if sender.cache_owner_path is not None:
+        previous = instance.__dict__.get('_cache_parent_id')
+        current = _parent_id(instance)
+        if not created and previous is not None and previous != current:
+            departed = owners_for_parents(sender, [previous]) - owners
+            bury(sender, [(instance.pk, owner_id) for owner_id in departed])
+            owners |= departed
+            sync_children(sender, [instance.pk])
+            for dependent in sender.cache_dependents:
+                invalidate(dependent, owners)
+        instance._cache_parent_id = current
+    invalidate(sender.cache_resource, owners)
+
+
+def invalidate_deleted(sender, instance, **kwargs):
+    owners = owners_of(sender, [instance])
+    bury(sender, [(instance.pk, owner_id) for owner_id in owners])
+    invalidate(sender.cache_resource, owners)
+
+
+def reset_local_tiers(setting, **kwargs):
+    if setting in ('API_CACHE', 'CACHES'):
+        local.entries.clear()
+        local.generations.clear()
+
+
+def connect():
+    setting_changed.connect(reset_local_tiers)
+    for model in apps.get_models():
+        if not issubclass(model, VersionedModel) or model.cache_resource is None:
+            continue
+        post_init.connect(remember_parent, sender=model)
+        post_save.connect(invalidate_saved, sender=model)
+        post_delete.connect(invalidate_deleted, sender=model)
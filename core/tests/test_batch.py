@@ -0,0 +1,147 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import DisallowedHost
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from content.models import Post
+from todos.models import Todo
+from ..cache import clear_caches
+
+User = get_user_model()
+
+
+class BatchTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='batch_user', email='batch@example.com', password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.todo = Todo.objects.create(user=self.user, title='Todo', completed=False)
+        self.post = Post.objects.create(user=self.user, title='Post', body='Body')
+        self.url = reverse('batch')
+
+    def batch(self, *requests, concurrent=False):
+        response = self.client.post(self.url, {'requests': list(requests), 'concurrent': concurrent}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return json.loads(response.content)
+
+    def test_runs_every_request(self):
+        results = self.batch(
+            {'path': f'/v1/users/{self.user.pk}/'},
+            {'path': '/v1/todos/?completed=false'},
+            {'path': f'/v1/posts/{self.post.pk}/'},
+        )
+
+        self.assertEqual([result['status'] for result in results], [200, 200, 200])
+        self.assertEqual(results[0]['body']['username'], 'batch_user')
+        self.assertEqual(results[1]['body'][0]['id'], self.todo.pk)
+        self.assertEqual(results[2]['body']['title'], 'Post')
+
+    def test_cache_applies_to_sub_requests(self):
+        first, = self.batch({'path': '/v1/todos/'})
+        second, = self.batch({'path': '/v1/todos/'})
+        self.assertEqual(first['headers']['X-Cache'], 'miss')
+        self.assertEqual(second['headers']['X-Cache'], 'local')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.batch({'path': '/v1/todos/'})
+        self.assertEqual(len(queries), 0)
+
+        revalidated, = self.batch({'path': '/v1/todos/', 'headers': {'If-None-Match': first['headers']['ETag']}})
+        self.assertEqual(revalidated['status'], 304)
+        self.assertIsNone(revalidated['body'])
+
+    def test_writes_in_order(self):
+        results = self.batch(
+            {'method': 'POST', 'path': '/v1/todos/', 'body': {'user': self.user.pk, 'title': 'New'}},
+            {'method': 'PATCH', 'path': f'/v1/todos/{self.todo.pk}/', 'body': {'completed': True}},
+            {'path': '/v1/todos/?completed=true'},
+        )
+
+        self.assertEqual([result['status'] for result in results], [201, 200, 200])
+        self.assertEqual([todo['id'] for todo in results[2]['body']], [self.todo.pk])
+        self.assertTrue(Todo.objects.filter(title='New', user=self.user).exists())
+
+    def test_sub_request_errors(self):
+        results = self.batch(
+            {'path': '/v1/nothing-here/'},
+            {'path': '/admin/'},
+            {'method': 'POST', 'path': '/v1/batch', 'body': {'requests': []}},
+            {'method': 'POST', 'path': '/v1/todos/', 'body': {}},
+        )
+
+        self.assertEqual([result['status'] for result in results], [404, 400, 400, 400])
+        self.assertIn('title', results[3]['body'])
+
+    def test_exceptions_fail_only_their_entry(self):
+        requests = ({'path': '/v1/todos/'}, {'path': f'/v1/posts/{self.post.pk}/'})
+        with mock.patch('todos.views.TodoViewSet.list', side_effect=RuntimeError('boom')), \
+                self.assertLogs('core.views', 'ERROR'):
+            results = self.batch(*requests)
+
+        self.assertEqual([result['status'] for result in results], [500, 200])
+        self.assertEqual(results[0]['body'], {'detail': 'A server error occurred.'})
+
+        with mock.patch('todos.views.TodoViewSet.list', side_effect=DisallowedHost('evil.example')):
+            results = self.batch(*requests)
+        self.assertEqual([result['status'] for result in results], [400, 200])
+
+    def test_streaming_responses_are_rejected(self):
+        results = self.batch(
+            {'path': f'/v1/users/{self.user.pk}/export/', 'headers': {'Accept': 'application/x-ndjson'}},
+            {'path': f'/v1/todos/{self.todo.pk}/'},
+        )
+
+        self.assertEqual([result['status'] for result in results], [400, 200])
+        self.assertEqual(results[0]['body'], {'detail': 'Streaming responses cannot be batched.'})
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, {'requests': [{'path': '/v1/todos/'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_validates_payload(self):
+        response = self.client.post(self.url, {'requests': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConcurrentBatchTest(TransactionTestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='batch_threads', email='threads@example.com',
+                                             password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Todo.objects.create(user=self.user, title='Todo', completed=False)
+
+    def test_concurrent_gets_around_a_write(self):
+        requests = [
+            {'path': '/v1/todos/'},
+            {'path': f'/v1/users/{self.user.pk}/'},
+            {'method': 'POST', 'path': '/v1/todos/', 'body': {'user': self.user.pk, 'title': 'Second'}},
+            {'path': '/v1/todos/'},
+            {'path': '/v1/posts/'},
+        ]
+        response = self.client.post(reverse('batch'), {'requests': requests, 'concurrent': True}, format='json')
+        results = json.loads(response.content)
+
+        self.assertEqual([result['status'] for result in results], [200, 200, 201, 200, 200])
+        self.assertEqual(len(results[0]['body']), 1)
+        self.assertEqual(len(results[3]['body']), 2)
+
+    def test_concurrent_exceptions_fail_only_their_entry(self):
+        requests = [{'path': '/v1/todos/'}, {'path': f'/v1/users/{self.user.pk}/'}]
+        with mock.patch('todos.views.TodoViewSet.list', side_effect=RuntimeError('boom')), \
+                self.assertLogs('core.views', 'ERROR'):
+            response = self.client.post(reverse('batch'), {'requests': requests, 'concurrent': True}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['status'] for result in json.loads(response.content)], [500, 200])
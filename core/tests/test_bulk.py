@@ -0,0 +1,192 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from content.models import Post, Comment
+from media.models import Album, Photo
+from todos.models import Todo
+from ..cache import clear_caches, get_generation
+
+User = get_user_model()
+
+
+class BulkCreateTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='bulk_user', email='bulk@example.com', password='password123')
+        self.other_user = User.objects.create_user(username='bulk_other', email='bulkother@example.com',
+                                                   password='password456')
+        self.client.force_authenticate(user=self.user)
+        self.album = Album.objects.create(user=self.user, title='Album')
+        self.other_album = Album.objects.create(user=self.other_user, title='Other Album')
+
+    def photos(self, count, album=None):
+        return [{'album': (album or self.album).pk, 'title': f'Photo {i}', 'url': 'https://example.com/p.png'}
+                for i in range(count)]
+
+    def test_creates_batch_with_one_insert(self):
+        before = get_generation('photos', self.user.pk)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('photo-list'), self.photos(5), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual([photo['title'] for photo in response.data], [f'Photo {i}' for i in range(5)])
+        self.assertTrue(all(photo['id'] for photo in response.data))
+        self.assertEqual(Photo.objects.filter(owner=self.user).count(), 5)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+        self.assertGreater(get_generation('photos', self.user.pk), before)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        def count(size):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(reverse('photo-list'), self.photos(size), format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+            return len(queries)
+
+        self.assertEqual(count(2), count(20))
+
+    def test_missing_parent_is_an_item_error(self):
+        payload = self.photos(2)
+        payload[1]['album'] = self.other_album.pk + 100
+        payload.append({'album': 'x', 'title': 'Bad', 'url': 'https://example.com/p.png'})
+
+        response = self.client.post(reverse('photo-list'), payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertEqual(response.data[1]['album'][0].code, 'does_not_exist')
+        self.assertEqual(response.data[2]['album'][0].code, 'incorrect_type')
+
+    def test_validation_errors_are_per_item(self):
+        payload = self.photos(3)
+        payload[1]['url'] = 'not a url'
+
+        response = self.client.post(reverse('photo-list'), payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('url', response.data[1])
+        self.assertFalse(Photo.objects.exists())
+
+    def test_foreign_parent_rejects_batch(self):
+        payload = self.photos(2) + self.photos(1, album=self.other_album)
+
+        response = self.client.post(reverse('photo-list'), payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data[:2], [{}, {}])
+        self.assertIn('album', response.data[2])
+        self.assertFalse(Photo.objects.exists())
+
+    def test_comments(self):
+        post = Post.objects.create(user=self.user, title='Post', body='Body')
+        payload = [{'post': post.pk, 'name': f'c{i}', 'email': 'c@example.com', 'body': 'b'} for i in range(3)]
+
+        response = self.client.post(reverse('comment-list'), payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(Comment.objects.filter(owner=self.user, post=post).count(), 3)
+
+    def test_rows_belong_to_requesting_user(self):
+        todos = [{'user': self.other_user.pk, 'title': f'Todo {i}', 'completed': False} for i in range(2)]
+        posts = [{'user': self.user.pk, 'title': 'Post', 'body': 'Body'}]
+
+        self.assertEqual(self.client.post(reverse('todo-list'), todos, format='json').status_code,
+                         status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post(reverse('post-list'), posts, format='json').status_code,
+                         status.HTTP_201_CREATED)
+        self.assertEqual(Todo.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(Post.objects.filter(user=self.user).count(), 1)
+
+    def test_batch_size_limit(self):
+        response = self.client.post(reverse('photo-list'), self.photos(1001), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Photo.objects.exists())
+
+    def test_single_object_payload_unchanged(self):
+        response = self.client.post(reverse('photo-list'), self.photos(1)[0], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['title'], 'Photo 0')
+
+
+class BulkWriteTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='bulk_write', email='bulkwrite@example.com',
+                                             password='password123')
+        self.other_user = User.objects.create_user(username='bulk_write_other', email='bulkwriteother@example.com',
+                                                   password='password456')
+        self.client.force_authenticate(user=self.user)
+        self.todos = Todo.objects.bulk_create([Todo(user=self.user, title=f'Todo {i}', completed=i % 2 == 0)
+                                               for i in range(4)])
+        self.other_todo = Todo.objects.create(user=self.other_user, title='Other', completed=False)
+        album = Album.objects.create(user=self.user, title='Album')
+        self.photos = Photo.objects.bulk_create([Photo(album=album, title=f'p{i}', url='https://example.com/p.png')
+                                                 for i in range(3)])
+        other_album = Album.objects.create(user=self.other_user, title='Other Album')
+        self.other_photo = Photo.objects.create(album=other_album, title='o', url='https://example.com/o.png')
+
+    def writes(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format='json')
+        return response, [query['sql'] for query in queries if not query['sql'].startswith(('SELECT', 'SAVEPOINT',
+                                                                                            'RELEASE'))]
+
+    def test_mark_all_complete(self):
+        self.client.get(reverse('todo-list'))
+        response, writes = self.writes('patch', reverse('todo-list'), {'completed': True})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data, {'updated': 4})
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith('UPDATE'))
+        self.assertFalse(Todo.objects.filter(user=self.user, completed=False).exists())
+        self.assertFalse(Todo.objects.get(pk=self.other_todo.pk).completed)
+        self.assertTrue(all(todo['completed'] for todo in self.client.get(reverse('todo-list')).data))
+
+    def test_update_by_ids_and_filter(self):
+        ids = f'{self.todos[0].pk},{self.todos[1].pk},{self.other_todo.pk}'
+        response = self.client.patch(f"{reverse('todo-list')}?ids={ids}&completed=false", {'title': 'Renamed'},
+                                     format='json')
+
+        self.assertEqual(response.data, {'updated': 1})
+        self.assertEqual(Todo.objects.get(pk=self.todos[1].pk).title, 'Renamed')
+        self.assertEqual(Todo.objects.get(pk=self.other_todo.pk).title, 'Other')
+
+    def test_update_rejects_other_fields(self):
+        response = self.client.patch(reverse('todo-list'), {'user': self.other_user.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('user', response.data)
+
+        response = self.client.patch(reverse('todo-list'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_delete_photos_by_ids(self):
+        self.client.get(reverse('photo-list'))
+        ids = ','.join(str(pk) for pk in [self.photos[0].pk, self.photos[2].pk, self.other_photo.pk])
+        response, writes = self.writes('delete', f"{reverse('photo-list')}?ids={ids}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'deleted': 2})
+        self.assertEqual([write.split()[0] for write in writes], ['INSERT', 'DELETE'])
+        self.assertIn('core_tombstone', writes[0])
+        self.assertTrue(Photo.objects.filter(pk=self.other_photo.pk).exists())
+        self.assertEqual([photo['id'] for photo in self.client.get(reverse('photo-list')).data], [self.photos[1].pk])
+
+    def test_delete_requires_ids(self):
+        self.assertEqual(self.client.delete(reverse('photo-list')).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.delete(f"{reverse('photo-list')}?ids=x").status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Photo.objects.count(), 4)
+
+    def test_collections_without_bulk_actions(self):
+        response = self.client.delete(f"{reverse('album-list')}?ids=1")
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
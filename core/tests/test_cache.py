@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+
+from content.models import Post, Comment
+from media.models import Album, Photo
+from todos.models import Todo
+from .. import cache
+from ..cache import bump_generation, get_generation, make_key
+from ..models import Tombstone
+
+User = get_user_model()
+
+
+class GenerationTest(TestCase):
+
+    def test_bump_changes_key(self):
+        key = make_key('todos', 1, 'list')
+        bump_generation('todos', 1)
+        self.assertNotEqual(make_key('todos', 1, 'list'), key)
+
+    def test_bump_does_not_touch_other_owners(self):
+        other = get_generation('todos', 2)
+        bump_generation('todos', 1)
+        self.assertEqual(get_generation('todos', 2), other)
+
+
+class InvalidationSignalTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gen_user', email='gen@example.com', password='password123')
+        self.other_user = User.objects.create_user(username='gen_other', email='genother@example.com',
+                                                   password='password456')
+
+    def assertBumps(self, resource, owner_id, func):
+        before = get_generation(resource, owner_id)
+        func()
+        self.assertGreater(get_generation(resource, owner_id), before)
+
+    def test_save_and_delete_bump_owner(self):
+        todo = Todo(user=self.user, title='Todo')
+        self.assertBumps('todos', self.user.pk, todo.save)
+        self.assertBumps('todos', self.user.pk, todo.delete)
+
+    def test_nested_owner(self):
+        post = Post.objects.create(user=self.user, title='Post', body='Body')
+        album = Album.objects.create(user=self.user, title='Album')
+        self.assertBumps('comments', self.user.pk,
+                         lambda: Comment.objects.create(post=post, name='n', email='n@example.com', body='b'))
+        self.assertBumps('photos', self.user.pk,
+                         lambda: Photo.objects.create(album=album, title='p', url='https://example.com/p.png'))
+
+    def test_reassigning_parent_bumps_both_owners(self):
+        post = Post.objects.create(user=self.user, title='Post', body='Body')
+        post = Post.objects.get(pk=post.pk)
+        before = get_generation('comments', self.user.pk)
+        post.user = self.other_user
+        self.assertBumps('posts', self.other_user.pk, post.save)
+        self.assertGreater(get_generation('comments', self.user.pk), before)
+
+    def test_queryset_update(self):
+        Todo.objects.create(user=self.user, title='Todo')
+        self.assertBumps('todos', self.user.pk, lambda: Todo.objects.filter(user=self.user).update(completed=True))
+
+    def test_bulk_create(self):
+        self.assertBumps('todos', self.user.pk,
+                         lambda: Todo.objects.bulk_create([Todo(user=self.user, title='a'),
+                                                           Todo(user=self.user, title='b')]))
+
+    def test_user_change_bumps_global_scope(self):
+        self.user.first_name = 'Changed'
+        self.assertBumps('users', None, self.user.save)
+
+    def delete_post(self, comments):
+        post = Post.objects.create(user=self.user, title='Post', body='Body')
+        Comment.objects.bulk_create([Comment(post=post, name='n', email='n@example.com', body='b')
+                                     for _ in range(comments)])
+        with mock.patch('core.cache.bump_generation', wraps=cache.bump_generation) as bump, \
+                CaptureQueriesContext(connection) as queries:
+            post.delete()
+        burials = [query for query in queries.captured_queries if 'core_tombstone' in query['sql']]
+        return {call.args for call in bump.call_args_list}, bump.call_count, len(queries), len(burials)
+
+    def test_cascading_delete_invalidates_once(self):
+        few = self.delete_post(comments=2)
+        many = self.delete_post(comments=50)
+
+        self.assertEqual(many[:2], few[:2])
+        self.assertEqual(few[0], {('posts', self.user.pk), ('comments', self.user.pk)})
+        self.assertEqual(few[1], 2)
+
+    def test_cascading_delete_buries_in_one_insert(self):
+        few = self.delete_post(comments=2)
+        many = self.delete_post(comments=50)
+
+        self.assertEqual(many[2:], few[2:])
+        self.assertEqual(few[3], 1)
+        self.assertEqual(Tombstone.objects.filter(resource='comments').count(), 52)
+        self.assertEqual(Tombstone.objects.filter(resource='posts').count(), 2)
@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from content.models import Post, Comment
+from todos.models import Todo
+from ..cache import clear_caches, get_generation
+
+User = get_user_model()
+
+
+class ChangesetTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='changes_user', email='changes@example.com',
+                                             password='password123')
+        self.other_user = User.objects.create_user(username='changes_other', email='changesother@example.com',
+                                                   password='password456')
+        self.client.force_authenticate(user=self.user)
+        self.todos = Todo.objects.bulk_create([Todo(user=self.user, title=f'Todo {i}') for i in range(3)])
+        self.other_post = Post.objects.create(user=self.other_user, title='Other', body='Body')
+        self.url = reverse('changeset')
+
+    def apply(self, *operations):
+        return self.client.post(self.url, {'operations': list(operations)}, format='json')
+
+    def comment(self, post, name):
+        return {'op': 'create', 'resource': 'comments',
+                'data': {'post': post, 'name': name, 'email': 'c@example.com', 'body': 'b'}}
+
+    def test_mixed_operations_with_references(self):
+        response = self.apply(
+            {'op': 'create', 'resource': 'posts', 'ref': 'draft', 'data': {'user': self.user.pk, 'title': 'T',
+                                                                           'body': 'B'}},
+            {**self.comment({'$ref': 'draft'}, 'first'), 'ref': 'first'},
+            self.comment({'$ref': 'draft'}, 'second'),
+            {'op': 'update', 'resource': 'comments', 'id': {'$ref': 'first'}, 'data': {'name': 'edited'}},
+            {'op': 'update', 'resource': 'todos', 'id': self.todos[0].pk, 'data': {'completed': True}},
+            {'op': 'update', 'resource': 'todos', 'id': self.todos[1].pk, 'data': {'title': 'Renamed'}},
+            {'op': 'delete', 'resource': 'todos', 'id': self.todos[2].pk},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        post = Post.objects.get(pk=response.data['refs']['draft'])
+        self.assertEqual(sorted(post.comments.values_list('name', flat=True)), ['edited', 'second'])
+        self.assertEqual(response.data['results'][3]['name'], 'edited')
+        self.assertTrue(Todo.objects.get(pk=self.todos[0].pk).completed)
+        self.assertEqual(Todo.objects.get(pk=self.todos[1].pk).title, 'Renamed')
+        self.assertFalse(Todo.objects.filter(pk=self.todos[2].pk).exists())
+        self.assertIsNone(response.data['results'][6])
+
+    def test_groups_consecutive_operations(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.apply(*[
+                {'op': 'update', 'resource': 'todos', 'id': todo.pk, 'data': {'completed': True}}
+                for todo in self.todos
+            ])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        updates = [query for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+
+    def test_invalidates_once(self):
+        self.client.get(reverse('todo-list'))
+        before = get_generation('todos', self.user.pk)
+
+        self.apply(
+            {'op': 'update', 'resource': 'todos', 'id': self.todos[0].pk, 'data': {'completed': True}},
+            {'op': 'delete', 'resource': 'todos', 'id': self.todos[1].pk},
+        )
+
+        self.assertEqual(get_generation('todos', self.user.pk), before + 1)
+        self.assertEqual(len(self.client.get(reverse('todo-list')).data), 2)
+
+    def test_failure_rolls_back(self):
+        response = self.apply(
+            {'op': 'delete', 'resource': 'todos', 'id': self.todos[0].pk},
+            {'op': 'update', 'resource': 'todos', 'id': self.todos[1].pk, 'data': {'completed': 'maybe'}},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['index'], 1)
+        self.assertIn('completed', response.data['errors'])
+        self.assertEqual(Todo.objects.count(), 3)
+
+    def test_scoped_to_user(self):
+        other_todo = Todo.objects.create(user=self.other_user, title='Other')
+
+        response = self.apply({'op': 'delete', 'resource': 'todos', 'id': other_todo.pk})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        post = Post.objects.create(user=self.user, title='Own', body='Body')
+        response = self.apply(self.comment(post.pk, 'fine'), self.comment(self.other_post.pk, 'foreign'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN, response.data)
+        self.assertEqual(response.data['index'], 1)
+        self.assertFalse(Comment.objects.exists())
+
+        response = self.apply({'op': 'update', 'resource': 'todos', 'id': self.todos[0].pk,
+                               'data': {'user': self.other_user.pk}})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Todo.objects.get(pk=self.todos[0].pk).user, self.user)
+
+    def test_bad_operations(self):
+        self.assertEqual(self.apply({'op': 'create', 'resource': 'users', 'data': {}}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.apply({'op': 'delete', 'resource': 'todos'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        response = self.apply({'op': 'delete', 'resource': 'todos', 'id': {'$ref': 'missing'}})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('$ref', response.data['errors'])
@@ -0,0 +1,289 @@
+import json
+import pstats
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from content.models import Comment, Post
+from media.models import Album, Photo
+from todos.models import Todo
+from ..management.commands.benchmark_endpoints import regressions
+from ..management.commands.import_dataset import iter_array
+from ..management.commands.index_audit import SEQUENTIAL_SCAN
+from ..models import Tombstone
+
+User = get_user_model()
+
+
+class IndexAuditCommandTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='audit_user', email='audit@example.com',
+                                             password='password123')
+        Todo.objects.create(user=self.user, title='Todo', completed=False)
+
+    def test_audits_every_route_and_filter(self):
+        out = StringIO()
+
+        call_command('index_audit', user='audit_user', stdout=out)
+
+        output = out.getvalue()
+        for prefix in ('users', 'todos', 'posts', 'comments', 'albums', 'photos'):
+            self.assertIn(f'/v1/{prefix}/', output)
+        self.assertIn('/v1/todos/?completed=false', output)
+        self.assertIn('ok       /v1/todos/', output)
+
+    def test_sqlite_index_scans_are_not_flagged(self):
+        pattern = SEQUENTIAL_SCAN['sqlite']
+
+        self.assertIsNone(pattern.search('SCAN todos_todo USING INDEX todo_user_id_cover_idx'))
+        self.assertIsNone(pattern.search('SCAN todos_todo USING COVERING INDEX todo_user_id_cover_idx'))
+        self.assertEqual(pattern.search('SCAN todos_todo').group(1), 'todos_todo')
+
+
+class PruneTombstonesCommandTest(TestCase):
+
+    def test_prunes_expired_tombstones(self):
+        Tombstone.objects.create(resource='todos', owner_id=1, object_id=1,
+                                 deleted_at=timezone.now() - timedelta(days=31))
+        recent = Tombstone.objects.create(resource='todos', owner_id=1, object_id=2)
+        out = StringIO()
+
+        call_command('prune_tombstones', stdout=out)
+
+        self.assertEqual(list(Tombstone.objects.values_list('pk', flat=True)), [recent.pk])
+        self.assertIn('Pruned 1 tombstones.', out.getvalue())
+
+
+class ImportDatasetCommandTest(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name)
+        # External ids deliberately differ from the ones the database hands out.
+        self.write('users.json', [{
+            'id': 7, 'name': 'Leanne Graham', 'username': 'Bret', 'email': 'Sincere@april.biz',
+            'address': {'street': 'Kulas Light', 'suite': 'Apt. 556', 'city': 'Gwenborough',
+                        'zipcode': '92998-3874', 'geo': {'lat': '-37.3159', 'lng': '81.1496'}},
+            'phone': '1-770-736-8031 x56442', 'website': 'hildegard.org',
+            'company': {'name': 'Romaguera-Crona', 'catchPhrase': 'Multi-layered', 'bs': 'e-markets'},
+        }, {'id': 9, 'name': 'Ervin', 'username': 'Antonette', 'email': 'Shanna@melissa.tv'}])
+        self.write('posts.json', [{'userId': 9, 'id': 40 + i, 'title': f'Post {i}', 'body': 'Body'} for i in range(3)])
+        self.write('comments.ndjson', [{'postId': 41, 'id': i, 'name': f'Comment {i}', 'email': 'c@example.com',
+                                        'body': 'Body'} for i in range(5)])
+        self.write('albums.json', [{'userId': 7, 'id': 3, 'title': 'Album'}])
+        self.write('photos.json', [{'albumId': 3, 'id': i, 'title': f'Photo {i}', 'url': 'https://via.placeholder.com/600',
+                                    'thumbnailUrl': 'https://via.placeholder.com/150'} for i in range(4)])
+        self.write('todos.json', [{'userId': 7, 'id': 1, 'title': 'Todo', 'completed': True}])
+
+    def write(self, name, records):
+        with open(self.path / name, 'w') as file:
+            if name.endswith('.ndjson'):
+                file.writelines(json.dumps(record) + '\n' for record in records)
+            else:
+                json.dump(records, file, indent=2)
+
+    def test_imports_and_maps_ids(self):
+        out = StringIO()
+
+        call_command('import_dataset', str(self.path), batch_size=2, stdout=out)
+
+        leanne = User.objects.get(username='Bret')
+        ervin = User.objects.get(username='Antonette')
+        self.assertEqual((leanne.first_name, leanne.last_name, leanne.zipcode, leanne.lat, leanne.company_name),
+                         ('Leanne', 'Graham', 92998, -37.3159, 'Romaguera-Crona'))
+        self.assertEqual(leanne.phone, '1-770-736-8031 x5644')
+        self.assertFalse(leanne.has_usable_password())
+        self.assertEqual(Post.objects.filter(user=ervin).count(), 3)
+        second_post = Post.objects.get(title='Post 1')
+        self.assertEqual(Comment.objects.filter(post=second_post, owner=ervin).count(), 5)
+        self.assertEqual(Photo.objects.filter(album__title='Album', owner=leanne).count(), 4)
+        self.assertTrue(Todo.objects.get(user=leanne).completed)
+        output = out.getvalue()
+        self.assertIn('photos: 4 rows in', output)
+        self.assertIn('rows/s', output)
+        self.assertIn('Imported 16 rows', output)
+        self.assertIn('1 values were cut', output)
+
+    def test_unknown_parent_rolls_back(self):
+        self.write('todos.json', [{'userId': 8, 'id': 1, 'title': 'Orphan', 'completed': False}])
+
+        with self.assertRaisesMessage(CommandError, "todo 1: unknown userId 8."):
+            call_command('import_dataset', str(self.path), stdout=StringIO())
+
+        self.assertFalse(User.objects.filter(username='Bret').exists())
+
+    def test_streams_arrays_across_reads(self):
+        records = [{'id': i, 'title': 'a, [b] {c}', 'nested': {'list': [1, 2]}} for i in range(20)]
+
+        self.assertEqual(list(iter_array(StringIO(json.dumps(records, indent=1)), read_size=7)), records)
+        self.assertEqual(list(iter_array(StringIO(' [ ] '))), [])
+        with self.assertRaises(ValueError):
+            list(iter_array(StringIO('[{"id": 1}, {"id": ')))
+
+
+class GenerateDatasetCommandTest(TestCase):
+
+    def generate(self, **options):
+        out = StringIO()
+        call_command('generate_dataset', users=20, whales=2, whale_photos=200, batch_size=64, stdout=out, **options)
+        return out.getvalue()
+
+    def test_zipf_skew_has_whales(self):
+        output = self.generate()
+
+        photos = sorted(User.objects.filter(username__startswith='user').annotate(count=Count('albums__photos'))
+                        .values_list('count', flat=True), reverse=True)
+        self.assertEqual(photos[:3], [200, 200, 100])
+        self.assertEqual(photos[-1], 50)
+        self.assertEqual(Photo.objects.count(), sum(photos))
+        self.assertEqual(Comment.objects.count(), Post.objects.count() * 5)
+        self.assertFalse(Photo.objects.exclude(owner_id=F('album__user_id')).exists())
+        self.assertIn(f'photos: {sum(photos)}', output)
+
+    def test_uniform_and_seeded(self):
+        self.generate(skew='uniform', seed=3)
+        self.assertEqual(Todo.objects.count(), 20 * 20)
+        self.assertEqual(Album.objects.count(), 20 * 10)
+        titles = list(Todo.objects.order_by('pk').values_list('title', flat=True)[:5])
+
+        self.generate(skew='uniform', seed=3, prefix='again')
+        again = Todo.objects.filter(user__username__startswith='again').order_by('pk')
+        self.assertEqual(list(again.values_list('title', flat=True)[:5]), titles)
+
+        with self.assertRaises(CommandError):
+            self.generate(prefix='again')
+
+
+class SnapshotCommandTest(TransactionTestCase):
+
+    def test_dump_and_restore(self):
+        call_command('generate_dataset', users=5, whale_photos=100, stdout=StringIO())
+        counts = [model.objects.count() for model in (User, Post, Comment, Album, Photo, Todo)]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        call_command('snapshot', 'dump', directory.name, stdout=StringIO())
+        Todo.objects.all().delete()
+        Post.objects.filter(pk=Post.objects.first().pk).delete()
+        cache.set('stale', 1)
+        out = StringIO()
+        call_command('snapshot', 'restore', directory.name, stdout=out)
+
+        self.assertEqual([model.objects.count() for model in (User, Post, Comment, Album, Photo, Todo)], counts)
+        self.assertFalse(Tombstone.objects.exists())
+        self.assertIsNone(cache.get('stale'))
+        self.assertIn('Restored', out.getvalue())
+
+    def test_restore_requires_a_snapshot(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(CommandError):
+                call_command('snapshot', 'restore', directory, stdout=StringIO())
+
+
+class BenchmarkEndpointsCommandTest(TestCase):
+
+    def setUp(self):
+        call_command('generate_dataset', users=3, whales=1, whale_photos=100, stdout=StringIO())
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def benchmark(self, name, *args, **options):
+        out = StringIO()
+        call_command('benchmark_endpoints', *args, requests=3, output=str(self.directory / name), stdout=out,
+                     **options)
+        return json.loads((self.directory / name).read_text()), out.getvalue()
+
+    def test_every_route_cold_and_warm(self):
+        todos = Todo.objects.count()
+        report, output = self.benchmark('report.json')
+        scenarios = report['scenarios']
+
+        whale = Photo.objects.values('owner').annotate(n=Count('pk')).order_by('-n')[0]['owner']
+        self.assertEqual(report['user'], whale)
+        for name in ('user-list', 'user-detail', 'user-posts', 'user-albums', 'user-todos', 'user-export',
+                     'todo-list', 'todo-detail', 'post-list', 'post-detail', 'post-comments', 'comment-list',
+                     'comment-detail', 'album-list', 'album-detail', 'album-photos', 'photo-list', 'photo-detail',
+                     'batch'):
+            self.assertIn(f'{name}:cold', scenarios)
+            self.assertIn(f'{name}:warm', scenarios)
+        self.assertIn('changeset:write', scenarios)
+        self.assertEqual(Todo.objects.count(), todos)
+
+        cold, warm = scenarios['photo-list:cold'], scenarios['photo-list:warm']
+        self.assertGreater(cold['cache_misses'], 0)
+        self.assertGreater(cold['queries'], 0)
+        self.assertEqual(warm['cache_misses'], 0)
+        self.assertGreater(warm['cache_hits'], 0)
+        self.assertEqual(warm['queries'], 0)
+        self.assertEqual(warm['bytes'], cold['bytes'])
+        self.assertLessEqual(warm['p50_ms'], warm['p95_ms'])
+        self.assertLessEqual(warm['p95_ms'], warm['p99_ms'])
+        self.assertIn('photo-list:warm', output)
+
+    def test_baseline_regressions(self):
+        baseline, _ = self.benchmark('baseline.json')
+        # Three requests say nothing about latency, so the baseline's timings
+        # are out of reach and only the counts are checked.
+        for metrics in baseline['scenarios'].values():
+            for metric in metrics:
+                if metric.endswith('_ms'):
+                    metrics[metric] = 1e9
+        baseline['scenarios']['todo-list:cold']['queries'] /= 2
+        baseline['scenarios']['todo-list:cold']['bytes'] /= 2
+        (self.directory / 'baseline.json').write_text(json.dumps(baseline))
+
+        with self.assertRaisesMessage(CommandError, '2 metrics regressed'):
+            self.benchmark('report.json', baseline=str(self.directory / 'baseline.json'))
+
+        _, output = self.benchmark('report.json', baseline=str(self.directory / 'baseline.json'),
+                                   threshold=['queries=10', 'bytes=1.5'])
+        self.assertIn('No regressions', output)
+
+    def test_unknown_threshold(self):
+        with self.assertRaises(CommandError):
+            self.benchmark('report.json', threshold=['speed=0.1'])
+
+    def test_zero_baseline_latency(self):
+        before = {'scenarios': {'todo-list:cold': {'query_ms': 0.0, 'p50_ms': 0.0, 'queries': 0}}}
+        after = {'scenarios': {'todo-list:cold': {'query_ms': 0.9, 'p50_ms': 1.5, 'queries': 1}}}
+
+        self.assertEqual(regressions(after, before, {'query_ms': 0.5, 'p50_ms': 0.5, 'queries': 0.0}),
+                         [('todo-list:cold', 'p50_ms', 0.0, 1.5), ('todo-list:cold', 'queries', 0, 1)])
+
+
+class BenchmarkSerializersCommandTest(TestCase):
+
+    def test_every_serializer(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = Path(directory.name) / 'results.json'
+        out = StringIO()
+        call_command('benchmark_serializers', rows=[20, 40], repeat=1, profile=directory.name, output=str(output),
+                     stdout=out)
+
+        results = json.loads(output.read_text())
+        self.assertEqual([(result['serializer'], result['rows']) for result in results],
+                         [(name, rows) for name in ('users', 'posts', 'comments', 'albums', 'photos', 'todos')
+                          for rows in (20, 40)])
+        for result in results:
+            self.assertGreater(result['rows_per_sec'], 0)
+            self.assertGreaterEqual(result['blocks_per_row'], 1)
+            self.assertEqual(result['queries_per_row'], 0)
+            self.assertGreater(pstats.Stats(result['profile']).total_calls, 0)
+        self.assertIn('photos      40 rows', out.getvalue())
+
+    def test_only_some_serializers(self):
+        out = StringIO()
+        call_command('benchmark_serializers', rows=[10], repeat=1, serializer=['users'], stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
@@ -0,0 +1,113 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from content.models import Post, Comment
+from media.models import Album, Photo
+from todos.models import Todo
+from ..cache import clear_caches
+
+User = get_user_model()
+
+
+class EmbedTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='embed_user', email='embed@example.com',
+                                             password='password123', first_name='Embed')
+        self.client.force_authenticate(user=self.user)
+        self.post = self.create_post()
+        self.list_url = reverse('post-list')
+
+    def create_post(self, comments=2):
+        post = Post.objects.create(user=self.user, title='Post', body='Body')
+        Comment.objects.bulk_create([Comment(post=post, name=f'c{i}', email='c@example.com', body='b')
+                                     for i in range(comments)])
+        return post
+
+    def count_queries(self, url, params):
+        clear_caches()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_embed_comments(self):
+        response = self.client.get(self.list_url, {'_embed': 'comments'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([comment['name'] for comment in response.data[0]['comments']], ['c0', 'c1'])
+        self.assertEqual(response.data[0]['comments'][0]['postId'], self.post.pk)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        params = {'_embed': 'comments', '_expand': 'user'}
+        single = self.count_queries(self.list_url, params)
+        for _ in range(4):
+            self.create_post(comments=3)
+
+        self.assertEqual(self.count_queries(self.list_url, params), single)
+
+    def test_expand_user(self):
+        todo = Todo.objects.create(user=self.user, title='Todo')
+        album = Album.objects.create(user=self.user, title='Album')
+        Photo.objects.create(album=album, title='p', url='https://example.com/p.png')
+
+        post = self.client.get(reverse('post-detail', kwargs={'pk': self.post.pk}), {'_expand': 'user'}).data
+        todos = self.client.get(reverse('todo-list'), {'_expand': 'user'}).data
+        albums = self.client.get(reverse('album-list'), {'_expand': 'user', '_embed': 'photos'}).data
+
+        self.assertEqual(post['user']['username'], 'embed_user')
+        self.assertEqual(todos[0]['user']['id'], self.user.pk)
+        self.assertEqual(todos[0]['id'], todo.pk)
+        self.assertEqual(albums[0]['user']['name'], 'Embed')
+        self.assertEqual(albums[0]['photos'][0]['title'], 'p')
+
+    def test_nested_action(self):
+        url = reverse('user-posts', kwargs={'pk': self.user.pk})
+        response = self.client.get(url, {'_embed': 'comments'})
+
+        self.assertEqual(len(response.data[0]['comments']), 2)
+
+    def test_nested_action_hides_other_users_children(self):
+        album = Album.objects.create(user=self.user, title='Album')
+        Photo.objects.create(album=album, title='p', url='https://example.com/p.png')
+        other = User.objects.create_user(username='other_embed_user', email='other@example.com',
+                                         password='password123')
+        posts = reverse('user-posts', kwargs={'pk': self.user.pk})
+        albums = reverse('user-albums', kwargs={'pk': self.user.pk})
+
+        self.client.force_authenticate(user=None)
+        anonymous = [self.client.get(posts, {'_embed': 'comments'}), self.client.get(albums, {'_embed': 'photos'}),
+                     self.client.get(albums, {'preview': 1})]
+        self.client.force_authenticate(user=other)
+        foreign = self.client.get(posts, {'preview': 2})
+        plain = self.client.get(posts)
+
+        for response in (*anonymous, foreign):
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(plain.status_code, status.HTTP_200_OK)
+        self.assertNotIn('comments', plain.data[0])
+
+    def test_with_sparse_fieldset(self):
+        response = self.client.get(self.list_url, {'fields': 'id', '_embed': 'comments'})
+
+        self.assertEqual(set(response.data[0]), {'id', 'comments'})
+        self.assertEqual(set(response.data[0]['comments'][0]), {'id', 'postId', 'name', 'email', 'body'})
+
+    def test_unknown_relation(self):
+        response = self.client.get(self.list_url, {'_embed': 'photos'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('_embed', response.data)
+
+    def test_child_change_invalidates_embedding_parent(self):
+        self.client.get(self.list_url, {'_embed': 'comments'})
+        Comment.objects.create(post=self.post, name='late', email='c@example.com', body='b')
+
+        response = self.client.get(self.list_url, {'_embed': 'comments'})
+
+        self.assertEqual(len(response.data[0]['comments']), 3)
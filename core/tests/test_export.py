@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from content.models import Comment, Post
+from media.models import Album, Photo
+from todos.models import Todo
+
+User = get_user_model()
+
+
+class UserExportTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='export_user', email='export@example.com',
+                                             password='password123')
+        self.other_user = User.objects.create_user(username='export_other', email='exportother@example.com',
+                                                   password='password456')
+        self.client.force_authenticate(user=self.user)
+        self.post = Post.objects.create(user=self.user, title='Post, with comma', body='Line one\nline two')
+        self.comment = Comment.objects.create(post=self.post, name='Reader', email='r@example.com', body='Nice')
+        self.album = Album.objects.create(user=self.user, title='Album')
+        self.photo = Photo.objects.create(album=self.album, title='Photo', url='https://example.com/1.png')
+        self.todos = Todo.objects.bulk_create([Todo(user=self.user, title=f'Todo {i}', completed=i % 2 == 0)
+                                               for i in range(3)])
+        other_post = Post.objects.create(user=self.other_user, title='Other', body='Other')
+        Comment.objects.create(post=other_post, name='Other', email='o@example.com', body='Other')
+        Todo.objects.create(user=self.other_user, title='Other')
+        self.url = reverse('user-export', kwargs={'pk': self.user.pk})
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson_is_the_default(self):
+        response, body = self.export()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="user-{self.user.pk}.ndjson"')
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([line['type'] for line in lines], ['post', 'comment', 'album', 'photo', 'todo', 'todo', 'todo'])
+        self.assertEqual(lines[0], {'type': 'post', 'id': self.post.pk, 'userId': self.user.pk,
+                                    'title': 'Post, with comma', 'body': 'Line one\nline two'})
+        self.assertEqual(lines[3]['thumbnailUrl'], None)
+        self.assertEqual([line['completed'] for line in lines[4:]], [True, False, True])
+
+    def test_csv_sections(self):
+        response, body = self.export(format='csv')
+
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[0], ['type', 'id', 'userId', 'title', 'body'])
+        self.assertEqual(rows[1], ['post', str(self.post.pk), str(self.user.pk), 'Post, with comma',
+                                   'Line one\nline two'])
+        self.assertEqual(rows[2], ['type', 'id', 'postId', 'name', 'email', 'body'])
+        self.assertEqual(rows[-4], ['type', 'id', 'userId', 'title', 'completed'])
+        self.assertEqual([row[-1] for row in rows[-3:]], ['true', 'false', 'true'])
+
+    def test_query_count_does_not_grow_with_rows(self):
+        with self.assertNumQueries(6):
+            self.export()
+        Todo.objects.bulk_create([Todo(user=self.user, title='More') for _ in range(50)])
+        with self.assertNumQueries(6):
+            self.export()
+
+    def test_only_own_data(self):
+        response = self.client.get(reverse('user-export', kwargs={'pk': self.other_user.pk}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=User.objects.create_user(username='staff', is_staff=True))
+        _, body = self.export()
+        self.assertEqual(len(body.splitlines()), 7)
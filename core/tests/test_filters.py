@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from content.models import Post, Comment
+from media.models import Album, Photo
+from todos.models import Todo
+from ..cache import clear_caches
+
+User = get_user_model()
+
+
+class QueryParamFilterTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='filter_user', email='filter@example.com',
+                                             password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.open_todo = Todo.objects.create(user=self.user, title='B open', completed=False)
+        self.done_todo = Todo.objects.create(user=self.user, title='A done', completed=True)
+
+    def ids(self, response):
+        return [row['id'] for row in response.json()]
+
+    def test_completed(self):
+        response = self.client.get(reverse('todo-list'), {'completed': 'false'})
+
+        self.assertEqual(self.ids(response), [self.open_todo.pk])
+
+    def test_invalid_value(self):
+        response = self.client.get(reverse('todo-list'), {'completed': 'maybe'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('completed', response.data)
+
+    def test_filtered_variant_does_not_leak_into_unfiltered_list(self):
+        self.client.get(reverse('todo-list'), {'completed': 'true'})
+
+        response = self.client.get(reverse('todo-list'))
+
+        self.assertEqual(len(response.json()), 2)
+
+    def test_album_id(self):
+        album = Album.objects.create(user=self.user, title='Album')
+        other_album = Album.objects.create(user=self.user, title='Other album')
+        photo = Photo.objects.create(album=album, title='Photo', url='https://example.com/1.png')
+        Photo.objects.create(album=other_album, title='Other', url='https://example.com/2.png')
+
+        response = self.client.get(reverse('photo-list'), {'albumId': album.pk})
+
+        self.assertEqual(self.ids(response), [photo.pk])
+
+    def test_repeated_post_id(self):
+        posts = [Post.objects.create(user=self.user, title=f'Post {i}', body='Body') for i in range(3)]
+        comments = [Comment.objects.create(post=post, name='n', email='n@example.com', body='b') for post in posts]
+
+        response = self.client.get(reverse('comment-list') + f'?postId={posts[0].pk}&postId={posts[2].pk}')
+
+        self.assertEqual(self.ids(response), [comments[0].pk, comments[2].pk])
+
+    def test_ordering(self):
+        response = self.client.get(reverse('todo-list'), {'ordering': 'title'})
+
+        self.assertEqual(self.ids(response), [self.done_todo.pk, self.open_todo.pk])
+
+    def test_ordering_outside_whitelist_is_ignored(self):
+        response = self.client.get(reverse('todo-list'), {'ordering': 'user__password'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.ids(response), [self.open_todo.pk, self.done_todo.pk])
+
+    def test_nested_action_filters(self):
+        response = self.client.get(reverse('user-todos', kwargs={'pk': self.user.pk}), {'completed': 'true'})
+
+        self.assertEqual(self.ids(response), [self.done_todo.pk])
+
+    def test_nested_action_parameters_do_not_filter_the_parent(self):
+        post = Post.objects.create(user=self.user, title='Post', body='Body')
+        comment = Comment.objects.create(post=post, name='c', email='c@example.com', body='b')
+        other = User.objects.create_user(username='filter_other', email='other@example.com', password='password123')
+
+        response = self.client.get(reverse('post-comments', kwargs={'pk': post.pk}),
+                                   {'userId': other.pk, 'fields': 'name'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [{'name': comment.name}])
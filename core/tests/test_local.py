@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from todos.models import Todo
+from .. import local
+from ..cache import bump_generation, clear_caches, generation_key, get_generation, tier_stats
+
+User = get_user_model()
+
+
+class LocalCacheTest(SimpleTestCase):
+
+    def test_least_recently_used_entry_is_evicted(self):
+        lru = local.LocalCache()
+        lru.set('a', 1, 60, 2)
+        lru.set('b', 2, 60, 2)
+        lru.get('a')
+        lru.set('c', 3, 60, 2)
+
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(len(lru), 2)
+
+    def test_expired_entry_is_dropped(self):
+        lru = local.LocalCache()
+        lru.set('a', 1, 0, 2)
+
+        self.assertIsNone(lru.get('a'))
+
+    def test_stats_report_hit_ratio(self):
+        stats = local.TierStats()
+        stats.record('local', True)
+        stats.record('local', False)
+
+        self.assertEqual(stats.report()['local']['hit_ratio'], 0.5)
+        self.assertIsNone(stats.report()['shared']['hit_ratio'])
+
+
+@override_settings(API_CACHE={'GENERATION_TTL': 60, 'FAMILIES': {'todos': {'LOCAL': True}}})
+class LocalTierTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='local_tier_user', email='local@example.com',
+                                             password='password123')
+        self.client.force_authenticate(user=self.user)
+        Todo.objects.create(user=self.user, title='Todo', completed=False)
+        self.list_url = reverse('todo-list')
+        local.stats.reset()
+
+    def test_second_hit_is_served_locally(self):
+        self.client.get(self.list_url)
+
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response['X-Cache'], 'local')
+        self.assertEqual(tier_stats()['local']['hits'], 1)
+
+    def test_generation_is_read_locally_until_bumped(self):
+        generation = get_generation('todos', self.user.pk)
+        key = generation_key('todos', self.user.pk)
+        cache.incr(key)
+
+        self.assertEqual(get_generation('todos', self.user.pk), generation)
+        bump_generation('todos', self.user.pk)
+        self.assertEqual(get_generation('todos', self.user.pk), generation + 2)
+
+    def test_write_is_visible_through_local_tier(self):
+        self.client.get(self.list_url)
+        Todo.objects.create(user=self.user, title='Another', completed=False)
+
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response['X-Cache'], 'miss')
+        self.assertEqual(len(response.data), 2)
@@ -0,0 +1,119 @@
+from django.contrib.auth import get_user_model
+from django.http import QueryDict
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from content.models import Post, Comment
+from todos.models import Todo
+from ..cache import clear_caches, query_fingerprint
+
+User = get_user_model()
+
+
+class QueryFingerprintTest(APITestCase):
+
+    def test_parameter_order_is_normalized(self):
+        self.assertEqual(query_fingerprint(QueryDict('a=1&b=2')), query_fingerprint(QueryDict('b=2&a=1')))
+
+    def test_values_are_part_of_the_fingerprint(self):
+        self.assertNotEqual(query_fingerprint(QueryDict('a=1')), query_fingerprint(QueryDict('a=2')))
+
+    def test_empty_query(self):
+        self.assertEqual(query_fingerprint(QueryDict('')), '-')
+
+
+class CachedListMixinTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='cached_list_user', email='cached@example.com',
+                                             password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse('todo-list')
+
+    def test_empty_list_is_cached(self):
+        self.client.get(self.list_url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [])
+
+    def test_query_string_selects_a_separate_entry(self):
+        self.client.get(self.list_url)
+
+        with self.assertNumQueries(1):
+            self.client.get(self.list_url, {'page': 'other'})
+
+    def test_hit_returns_rendered_bytes(self):
+        first = self.client.get(self.list_url)
+        second = self.client.get(self.list_url)
+
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+        self.assertFalse(hasattr(second, 'data'))
+
+    def test_browsable_api_is_not_cached(self):
+        self.client.get(self.list_url, HTTP_ACCEPT='text/html')
+
+        response = self.client.get(self.list_url, HTTP_ACCEPT='text/html')
+
+        self.assertTrue(hasattr(response, 'data'))
+
+
+class ConditionalGetTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='etag_user', email='etag@example.com', password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.todo = Todo.objects.create(user=self.user, title='Todo', completed=False)
+        self.post = Post.objects.create(user=self.user, title='Post', body='Body')
+        Comment.objects.create(post=self.post, name='Commenter', email='c@example.com', body='Comment')
+
+    def assertRevalidates(self, url):
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        return etag
+
+    def test_list(self):
+        self.assertRevalidates(reverse('todo-list'))
+
+    def test_detail(self):
+        self.assertRevalidates(reverse('todo-detail', kwargs={'pk': self.todo.pk}))
+
+    def test_nested_action(self):
+        self.assertRevalidates(reverse('post-comments', kwargs={'pk': self.post.pk}))
+
+    def test_missing_or_foreign_row_is_not_revalidated(self):
+        other = User.objects.create_user(username='etag_other', email='etag_other@example.com')
+        foreign = Todo.objects.create(user=other, title='Foreign', completed=False)
+
+        for pk in (999999, foreign.pk):
+            url = reverse('todo-detail', kwargs={'pk': pk})
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            self.assertNotIn('ETag', response)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_write_changes_etag(self):
+        url = reverse('todo-list')
+        etag = self.assertRevalidates(url)
+        Todo.objects.create(user=self.user, title='Another', completed=True)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_variants_have_distinct_etags(self):
+        url = reverse('todo-list')
+
+        self.assertNotEqual(self.client.get(url)['ETag'], self.client.get(url, {'completed': 'true'})['ETag'])
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from content.models import Post, Comment
+from media.models import Album, Photo
+from ..cache import get_generation
+
+User = get_user_model()
+
+
+class DenormalizedOwnerTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner_user', email='owner@example.com', password='password123')
+        self.other_user = User.objects.create_user(username='owner_other', email='ownerother@example.com',
+                                                   password='password456')
+        self.post = Post.objects.create(user=self.user, title='Post', body='Body')
+        self.other_post = Post.objects.create(user=self.other_user, title='Other', body='Body')
+        self.comment = Comment.objects.create(post=self.post, name='n', email='n@example.com', body='b')
+
+    def owners(self, model):
+        return list(model.objects.order_by('pk').values_list('owner_id', flat=True))
+
+    def test_create_copies_parent_owner(self):
+        self.assertEqual(self.comment.owner_id, self.user.pk)
+        album = Album.objects.create(user=self.other_user, title='Album')
+        photo = Photo.objects.create(album=album, title='p', url='https://example.com/p.png')
+        self.assertEqual(photo.owner_id, self.other_user.pk)
+
+    def test_create_with_cached_parent_needs_no_lookup(self):
+        with self.assertNumQueries(1):
+            Comment(post=self.post, name='n', email='n@example.com', body='b').save()
+
+    def test_moving_child_to_another_parent(self):
+        comment = Comment.objects.get(pk=self.comment.pk)
+        comment.post_id = self.other_post.pk
+        comment.save()
+        self.assertEqual(self.owners(Comment), [self.other_user.pk])
+
+    def test_reassigning_parent_moves_children(self):
+        before = get_generation('comments', self.other_user.pk)
+        post = Post.objects.get(pk=self.post.pk)
+        post.user = self.other_user
+        post.save()
+        self.assertEqual(self.owners(Comment), [self.other_user.pk])
+        self.assertGreater(get_generation('comments', self.other_user.pk), before)
+
+    def test_queryset_update_moves_children(self):
+        Post.objects.filter(pk=self.post.pk).update(user=self.other_user)
+        self.assertEqual(self.owners(Comment), [self.other_user.pk])
+        Comment.objects.update(post=self.post)
+        self.assertEqual(self.owners(Comment), [self.other_user.pk])
+        Comment.objects.update(post=self.other_post.pk)
+        Post.objects.bulk_update([Post(pk=self.other_post.pk, user=self.user)], ['user'])
+        self.assertEqual(self.owners(Comment), [self.user.pk])
+
+    def test_bulk_create_resolves_owners_in_one_query(self):
+        comments = [Comment(post_id=post.pk, name='n', email='n@example.com', body='b')
+                    for post in (self.post, self.other_post)]
+        with self.assertNumQueries(2):
+            Comment.objects.bulk_create(comments)
+        self.assertEqual([comment.owner_id for comment in comments], [self.user.pk, self.other_user.pk])
+
+    def test_bulk_update_of_parent_column(self):
+        self.comment.post_id = self.other_post.pk
+        Comment.objects.bulk_update([self.comment], ['post'])
+        self.assertEqual(self.owners(Comment), [self.other_user.pk])
@@ -0,0 +1,98 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from media.models import Album, Photo
+from todos.models import Todo
+from ..cache import clear_caches
+
+User = get_user_model()
+
+
+def link(response, rel):
+    match = re.search(rf'<([^>]+)>; rel="{rel}"', response.get('Link', ''))
+    return match.group(1) if match else None
+
+
+class CursorPaginationTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='cursor_user', email='cursor@example.com',
+                                             password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.todos = [Todo.objects.create(user=self.user, title=f'Todo {i}') for i in range(5)]
+        self.list_url = reverse('todo-list')
+
+    def test_pages_follow_next_links(self):
+        seen = []
+        url = f'{self.list_url}?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(todo['id'] for todo in response.json())
+            url = link(response, 'next')
+
+        self.assertEqual(seen, [todo.pk for todo in self.todos])
+
+    def test_body_stays_a_list(self):
+        response = self.client.get(self.list_url)
+
+        self.assertIsInstance(response.data, list)
+        self.assertNotIn('Link', response)
+
+    def test_cached_page_keeps_link_header(self):
+        first = self.client.get(self.list_url, {'page_size': 2})
+        second = self.client.get(self.list_url, {'page_size': 2})
+
+        self.assertIn(second['X-Cache'], ('local', 'shared'))
+        self.assertEqual(second['Link'], first['Link'])
+
+    def test_page_size_is_bounded(self):
+        Todo.objects.bulk_create([Todo(user=self.user, title='Bulk') for _ in range(1000)])
+
+        response = self.client.get(self.list_url, {'page_size': 5000})
+
+        self.assertEqual(len(response.data), 1000)
+        self.assertIsNotNone(link(response, 'next'))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.list_url, {'cursor': 'garbage'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class NestedPaginationTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='nested_cursor_user', email='nested@example.com',
+                                             password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.album = Album.objects.create(user=self.user, title='Album')
+        self.photos = Photo.objects.bulk_create([
+            Photo(album=self.album, title=f'Photo {i}', url=f'https://example.com/{i}.png') for i in range(5)
+        ])
+
+    def test_album_photos_are_paginated(self):
+        seen = []
+        url = reverse('album-photos', kwargs={'pk': self.album.pk}) + '?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.json()), 2)
+            seen.extend(photo['id'] for photo in response.json())
+            url = link(response, 'next')
+
+        self.assertEqual(seen, sorted(photo.pk for photo in self.photos))
+
+    def test_user_todos_are_paginated(self):
+        Todo.objects.bulk_create([Todo(user=self.user, title=f'Todo {i}') for i in range(3)])
+
+        response = self.client.get(reverse('user-todos', kwargs={'pk': self.user.pk}), {'page_size': 2})
+
+        self.assertEqual(len(response.data), 2)
+        self.assertIsNotNone(link(response, 'next'))
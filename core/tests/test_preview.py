@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from content.models import Post, Comment
+from media.models import Album, Photo
+from ..cache import clear_caches
+
+User = get_user_model()
+
+
+class PreviewTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='preview_user', email='preview@example.com',
+                                             password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.albums = [Album.objects.create(user=self.user, title=f'Album {i}') for i in range(3)]
+        Photo.objects.bulk_create([Photo(album=album, title=f'{album.pk}-{i}', url='https://example.com/p.png')
+                                   for album in self.albums for i in range(6)])
+        self.post = Post.objects.create(user=self.user, title='Post', body='Body')
+        Comment.objects.bulk_create([Comment(post=self.post, name=f'c{i}', email='c@example.com', body='b')
+                                     for i in range(5)])
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        photo_queries = [query['sql'] for query in queries if 'FROM "media_photo"' in query['sql']]
+        return response.data, photo_queries
+
+    def assertFirstPhotos(self, albums, size):
+        for album in albums:
+            self.assertEqual([photo['title'] for photo in album['photos']],
+                             [f"{album['id']}-{i}" for i in range(size)])
+
+    def test_album_preview_reads_first_photos_in_one_query(self):
+        albums, queries = self.get(reverse('album-list'), {'preview': 4})
+
+        self.assertFirstPhotos(albums, 4)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('ROW_NUMBER', queries[0])
+
+    def test_fallback_without_window_functions(self):
+        with mock.patch.object(connection.features, 'supports_over_clause', False):
+            albums, queries = self.get(reverse('album-list'), {'preview': 2})
+
+        self.assertFirstPhotos(albums, 2)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('ROW_NUMBER', queries[0])
+
+    def test_post_preview_has_latest_comments(self):
+        posts, _ = self.get(reverse('post-list'), {'preview': 3})
+
+        self.assertEqual([comment['name'] for comment in posts[0]['comments']], ['c4', 'c3', 'c2'])
+
+    def test_invalid_size(self):
+        for value in ('0', 'many', '1000'):
+            response = self.client.get(reverse('album-list'), {'preview': value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('preview', response.data)
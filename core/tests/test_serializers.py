@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from content.models import Post
+from ..cache import clear_caches
+
+User = get_user_model()
+
+
+class SparseFieldsetTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='sparse_user', email='sparse@example.com',
+                                             password='password123', first_name='Sparse', last_name='User')
+        self.client.force_authenticate(user=self.user)
+        self.post = Post.objects.create(user=self.user, title='Sparse Post', body='A long body')
+        self.list_url = reverse('post-list')
+
+    def select_sql(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        return response, [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+
+    def test_fields_trims_output_and_select(self):
+        response, sql = self.select_sql(self.list_url, {'fields': 'id,title'})
+
+        self.assertEqual(response.data, [{'id': self.post.pk, 'title': 'Sparse Post'}])
+        self.assertNotIn('"body"', sql[-1])
+
+    def test_exclude(self):
+        response, sql = self.select_sql(self.list_url, {'exclude': 'body'})
+
+        self.assertNotIn('body', response.data[0])
+        self.assertIn('userId', response.data[0])
+        self.assertNotIn('"body"', sql[-1])
+
+    def test_detail(self):
+        response = self.client.get(reverse('post-detail', kwargs={'pk': self.post.pk}), {'fields': 'title'})
+
+        self.assertEqual(response.data, {'title': 'Sparse Post'})
+
+    def test_method_fields_load_their_sources(self):
+        response, sql = self.select_sql(reverse('user-detail', kwargs={'pk': self.user.pk}), {'fields': 'id,name'})
+
+        self.assertEqual(response.data, {'id': self.user.pk, 'name': 'Sparse User'})
+        self.assertNotIn('"password"', sql[-1])
+        self.assertNotIn('"street"', sql[-1])
+
+    def test_field_order_shares_cache_entry(self):
+        first = self.client.get(self.list_url, {'fields': 'id,title'})
+        second = self.client.get(self.list_url, {'fields': 'title,id'})
+
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertNotEqual(first['ETag'], self.client.get(self.list_url)['ETag'])
+
+    def test_writes_ignore_fields(self):
+        response = self.client.post(f'{self.list_url}?fields=id', {'user': self.user.pk, 'title': 'New', 'body': 'B'},
+                                    format='json')
+
+        self.assertIn('body', response.data)
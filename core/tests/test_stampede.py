@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from todos.models import Todo
+from ..cache import acquire_lock, clear_caches, pack_entry, should_refresh, unpack_entry
+
+User = get_user_model()
+
+
+class ShouldRefreshTest(APITestCase):
+
+    def test_expired_entry_is_refreshed(self):
+        self.assertTrue(should_refresh(0, 0, 1.0))
+
+    def test_zero_beta_never_refreshes_early(self):
+        self.assertFalse(should_refresh(2 ** 40, 100, 0))
+
+
+@override_settings(API_CACHE={'LOCK_WAIT': 0, 'FAMILIES': {'users': {'STALE_ACROSS_WRITES': True}}})
+class StampedeTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='stampede_user', email='stampede@example.com',
+                                             password='password123')
+        self.client.force_authenticate(user=self.user)
+        Todo.objects.create(user=self.user, title='Todo', completed=False)
+        self.list_url = reverse('todo-list')
+
+    def expire(self):
+        key = self.cached_key()
+        body = unpack_entry(cache.get(key))[0]
+        cache.set(key, pack_entry(body, -1, 0))
+        return key
+
+    def cached_key(self):
+        with mock.patch('core.mixins.cache.set', wraps=cache.set) as cache_set:
+            Todo.objects.create(user=self.user, title='Bump', completed=False)
+            self.client.get(self.list_url)
+        return cache_set.call_args_list[0].args[0]
+
+    def test_expired_entry_is_recomputed_by_lock_holder(self):
+        self.expire()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url)
+
+        self.assertEqual(len(response.data), 2)
+
+    def test_stale_entry_is_served_while_locked(self):
+        key = self.expire()
+        acquire_lock(key, 10)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_previous_generation_served_across_writes_when_enabled(self):
+        users_url = reverse('user-list')
+        first = self.client.get(users_url)
+
+        with mock.patch('core.mixins.acquire_lock', return_value=False):
+            User.objects.create_user(username='late_user', email='late@example.com', password='password123')
+            response = self.client.get(users_url)
+
+        self.assertEqual(response.content, first.content)
+        self.assertNotIn('ETag', response)
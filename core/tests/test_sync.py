@@ -0,0 +1,172 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from content.models import Comment, Post
+from media.models import Album, Photo
+from todos.models import Todo
+from ..cache import clear_caches
+from ..models import Tombstone
+from ..serializers import sync_token
+
+User = get_user_model()
+
+
+class TimestampTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='stamp_user', password='password123')
+        self.todo = Todo.objects.create(user=self.user, title='Stamped')
+        self.past = timezone.now() - timedelta(hours=1)
+        Todo.objects.update(updated_at=self.past)
+
+    def updated_at(self):
+        return Todo.objects.get(pk=self.todo.pk).updated_at
+
+    def test_create_stamps_both(self):
+        todos = Todo.objects.bulk_create([Todo(user=self.user, title='Bulk')])
+        stored = Todo.objects.get(pk=todos[0].pk)
+        self.assertIsNotNone(stored.created_at)
+        self.assertIsNotNone(stored.updated_at)
+
+    def test_every_write_path_bumps_updated_at(self):
+        self.todo.title = 'Saved'
+        self.todo.save(update_fields=['title'])
+        self.assertGreater(self.updated_at(), self.past)
+
+        Todo.objects.update(updated_at=self.past)
+        Todo.objects.filter(pk=self.todo.pk).update(completed=True)
+        self.assertGreater(self.updated_at(), self.past)
+
+        Todo.objects.update(updated_at=self.past)
+        self.todo.title = 'Bulk'
+        Todo.objects.bulk_update([self.todo], ['title'])
+        self.assertGreater(self.updated_at(), self.past)
+
+    def test_moving_a_parent_buries_children_for_the_old_owner(self):
+        other = User.objects.create_user(username='stamp_other', password='password123')
+        album = Album.objects.create(user=self.user, title='Album')
+        photo = Photo.objects.create(album=album, title='Photo', url='http://example.com/p.png')
+
+        Album.objects.filter(pk=album.pk).update(user=other)
+
+        self.assertEqual(set(Tombstone.objects.values_list('resource', 'owner_id', 'object_id')),
+                         {('albums', self.user.pk, album.pk), ('photos', self.user.pk, photo.pk)})
+
+
+class ChangeFeedTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='sync_user', email='sync@example.com', password='password123')
+        self.other_user = User.objects.create_user(username='sync_other', email='syncother@example.com',
+                                                   password='password456')
+        self.client.force_authenticate(user=self.user)
+        self.todos = Todo.objects.bulk_create([Todo(user=self.user, title=f'Todo {i}') for i in range(5)])
+        self.post = Post.objects.create(user=self.user, title='Mine', body='Body')
+        self.other_post = Post.objects.create(user=self.other_user, title='Theirs', body='Body')
+        self.comment = Comment.objects.create(post=self.post, name='c', email='c@example.com', body='b')
+        # Rows written before the token fall outside the feed's overlap window.
+        for model in (Todo, Post, Comment, User):
+            model.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        self.token = sync_token(timezone.now())
+
+    def feed(self, url, token=None):
+        return self.client.get(url, {'since': self.token if token is None else token})
+
+    def test_first_sync_returns_everything(self):
+        response = self.feed(reverse('todo-list'), token='')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['changed']), 5)
+        self.assertEqual(response.data['deleted'], [])
+        self.assertTrue(response.data['token'])
+
+    def test_only_changes_are_returned(self):
+        Todo.objects.filter(pk=self.todos[1].pk).update(completed=True)
+        created = Todo.objects.create(user=self.user, title='New')
+        deleted = sorted([self.todos[2].pk, self.todos[3].pk])
+        self.todos[2].delete()
+        Todo.objects.filter(pk=self.todos[3].pk).delete()
+        Todo.objects.create(user=self.other_user, title='Not mine')
+
+        with self.assertNumQueries(2):
+            response = self.feed(reverse('todo-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([todo['id'] for todo in response.data['changed']], [self.todos[1].pk, created.pk])
+        self.assertEqual(response.data['deleted'], deleted)
+
+        later = self.feed(reverse('todo-list'), token=response.data['token'])
+        self.assertEqual(later.data['deleted'], response.data['deleted'])
+
+    def test_large_feeds_are_paged(self):
+        url = reverse('todo-list')
+        response = self.client.get(url, {'since': '', 'page_size': 2})
+        pages = [response.data]
+        Todo.objects.filter(pk=self.todos[0].pk).delete()
+        while pages[-1]['more']:
+            pages.append(self.client.get(url, {'since': pages[-1]['token'], 'page_size': 2}).data)
+
+        self.assertEqual([len(page['changed']) for page in pages], [2, 2, 1])
+        self.assertEqual([todo['id'] for page in pages for todo in page['changed']],
+                         [todo.pk for todo in self.todos])
+        self.assertEqual([page['deleted'] for page in pages], [[], [], []])
+
+        # The last token resumes from when the pass started, so a row deleted
+        # after it was sent is reported next time.
+        later = self.feed(url, token=pages[-1]['token'])
+        self.assertEqual(later.data['deleted'], [self.todos[0].pk])
+        self.assertFalse(later.data['more'])
+
+    def test_paged_changes_send_deletions_last(self):
+        url = reverse('todo-list')
+        Todo.objects.filter(user=self.user).update(title='Changed')
+        pages = [self.client.get(url, {'since': self.token, 'page_size': 3}).data]
+        deleted = self.todos[0].pk
+        self.todos[0].delete()
+        while pages[-1]['more']:
+            pages.append(self.client.get(url, {'since': pages[-1]['token'], 'page_size': 3}).data)
+
+        self.assertEqual([len(page['changed']) for page in pages], [3, 2])
+        self.assertEqual([page['deleted'] for page in pages], [[], [deleted]])
+
+    def test_respects_fields_and_filters(self):
+        Todo.objects.filter(pk__in=[self.todos[0].pk, self.todos[1].pk]).update(title='Changed')
+        Todo.objects.filter(pk=self.todos[0].pk).update(completed=True)
+
+        response = self.client.get(reverse('todo-list'), {'since': self.token, 'completed': 'true', 'fields': 'id'})
+
+        self.assertEqual(response.data['changed'], [{'id': self.todos[0].pk}])
+
+    def test_rows_moved_to_another_owner_are_deleted(self):
+        self.comment.post = self.other_post
+        self.comment.save()
+
+        response = self.feed(reverse('comment-list'))
+
+        self.assertEqual(response.data['changed'], [])
+        self.assertEqual(response.data['deleted'], [self.comment.pk])
+
+    def test_nested_and_user_feeds(self):
+        Todo.objects.filter(pk=self.todos[0].pk).update(title='Nested')
+        self.other_user.first_name = 'Renamed'
+        self.other_user.save()
+
+        nested = self.feed(reverse('user-todos', kwargs={'pk': self.user.pk}))
+        users = self.feed(reverse('user-list'))
+
+        self.assertEqual([todo['id'] for todo in nested.data['changed']], [self.todos[0].pk])
+        self.assertEqual([user['id'] for user in users.data['changed']], [self.other_user.pk])
+
+    def test_bad_and_expired_tokens(self):
+        self.assertEqual(self.feed(reverse('todo-list'), token='not a token').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        old = sync_token(timezone.now() - timedelta(days=2))
+        with override_settings(TOMBSTONE_RETENTION=timedelta(days=1)):
+            self.assertEqual(self.feed(reverse('todo-list'), token=old).status_code, status.HTTP_410_GONE)
@@ -0,0 +1,313 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.exceptions import SuspiciousOperation, ValidationError as DjangoValidationError
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import deferred_invalidation
+from .models import parent_field
+from .serializers import BatchSerializer, ChangesetSerializer
+
+logger = logging.getLogger(__name__)
+
+BATCH_PREFIX = '/v1/'
+BATCH_MAX_WORKERS = 4
+# Sub-responses keep their own conditional and caching headers; the ones
+# describing the transport of the outer response are dropped.
+DROPPED_HEADERS = {'content-length', 'content-type', 'vary', 'allow'}
+CHANGESET_RESOURCES = ('todos', 'posts', 'comments', 'photos')
+REF_KEY = '$ref'
+
+
+def sub_request(outer, method, path, body=None, headers=None):
+    url = urlsplit(path)
+    payload = b'' if body is None else json.dumps(body).encode()
+    environ = {
+        name: value for name, value in outer.META.items()
+        if not name.startswith('HTTP_IF_') and name not in ('CONTENT_LENGTH', 'CONTENT_TYPE')
+    }
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'HTTP_ACCEPT': 'application/json',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        'wsgi.input': BytesIO(payload),
+    })
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    request = WSGIRequest(environ)
+    # The batch was authenticated once; sub-requests run as the same user
+    # without repeating the session lookup or the authenticators.
+    request.user = outer.user
+    request._force_auth_user = outer.user
+    request._force_auth_token = outer.auth
+    if hasattr(outer._request, 'session'):
+        request.session = outer._request.session
+    return request
+
+
+def encode_response(response):
+    headers = {name: value for name, value in response.items() if name.lower() not in DROPPED_HEADERS}
+    content = response.content
+    if not content:
+        body = b'null'
+    elif response.get('Content-Type', '').startswith('application/json'):
+        # Rendered JSON, including cached entries, is spliced in as is.
+        body = content
+    else:
+        body = json.dumps(content.decode(response.charset)).encode()
+    return b'{"status":%d,"headers":%s,"body":%s}' % (response.status_code, json.dumps(headers).encode(), body)
+
+
+def error_result(status_code, detail):
+    return b'{"status":%d,"headers":{},"body":%s}' % (status_code, json.dumps({'detail': detail}).encode())
+
+
+class BatchView(APIView):
+    """Runs a list of API requests in-process and returns every result.
+
+    Sub-requests are dispatched in order to the regular views, so
+    permissions, validation and caching behave as for separate calls. With
+    ``concurrent``, consecutive GETs run on worker threads, each with its
+    own database connection; writes are never reordered.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['requests']
+        if serializer.validated_data['concurrent']:
+            results = self.run_concurrently(request, items)
+        else:
+            results = [self.run(request, item) for item in items]
+        return HttpResponse(b'[' + b','.join(results) + b']', content_type='application/json')
+
+    def run(self, request, item):
+        path = item['path']
+        if not path.startswith(BATCH_PREFIX):
+            return error_result(400, f'Only paths under {BATCH_PREFIX} can be batched.')
+        try:
+            match = resolve(urlsplit(path).path)
+        except Resolver404:
+            return error_result(404, 'Not found.')
+        if getattr(match.func, 'view_class', None) is type(self):
+            return error_result(400, 'Batches cannot be nested.')
+        # Whatever a sub-request raises fails only its own entry, as it
+        # would fail only its own response outside a batch.
+        try:
+            sub = sub_request(request, item['method'], path, item.get('body'), item.get('headers'))
+            response = match.func(sub, *match.args, **match.kwargs)
+            if response.streaming:
+                # Exports are meant to be read incrementally, never spliced
+                # into one buffered batch body.
+                response.close()
+                return error_result(400, 'Streaming responses cannot be batched.')
+            if hasattr(response, 'render'):
+                response.render()
+            return encode_response(response)
+        except SuspiciousOperation:
+            return error_result(400, 'Bad request.')
+        except Exception:
+            logger.exception('Batch sub-request %s %s failed', item['method'], path)
+            return error_result(500, 'A server error occurred.')
+
+    def run_threaded(self, request, item):
+        try:
+            return self.run(request, item)
+        finally:
+            connections.close_all()
+
+    def run_concurrently(self, request, items):
+        results = [None] * len(items)
+        with ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS) as executor:
+            pending = {}
+            for index, item in enumerate(items):
+                if item['method'] == 'GET':
+                    pending[index] = executor.submit(self.run_threaded, request, item)
+                    continue
+                for waiting, future in pending.items():
+                    results[waiting] = future.result()
+                pending = {}
+                results[index] = self.run(request, item)
+            for waiting, future in pending.items():
+                results[waiting] = future.result()
+        return results
+
+
+class OperationFailed(Exception):
+
+    def __init__(self, index, status_code, detail):
+        super().__init__(detail)
+        self.index = index
+        self.status_code = status_code
+        self.detail = detail
+
+
+def references(value):
+    if isinstance(value, dict):
+        if set(value) == {REF_KEY}:
+            return {value[REF_KEY]}
+        return set().union(*map(references, value.values()))
+    if isinstance(value, list):
+        return set().union(*map(references, value))
+    return set()
+
+
+def group_key(group):
+    operation = group[0][1]
+    return operation['op'], operation['resource']
+
+
+def first_error(group, status_code, errors):
+    position = next(position for position, error in enumerate(errors) if error)
+    return OperationFailed(group[position][0], status_code, errors[position])
+
+
+class ChangesetView(APIView):
+    """Applies an ordered list of writes atomically.
+
+    Every operation names a resource; creates may carry a ``ref`` that later
+    operations use as ``{"$ref": name}`` in place of the new row's id.
+    Consecutive operations of one kind on one resource are validated by the
+    resource's serializer together and written with one bulk statement, and
+    the caches they touch are invalidated once when the changeset is done.
+    If any operation fails, nothing is written.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = ChangesetSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.refs = {}
+        try:
+            with transaction.atomic(), deferred_invalidation():
+                results = []
+                for op, resource, group in self.groups(serializer.validated_data['operations']):
+                    results.extend(getattr(self, f'apply_{op}')(self.resource_view(resource, op), group))
+        except OperationFailed as exc:
+            return Response({'index': exc.index, 'errors': exc.detail}, status=exc.status_code)
+        return Response({'results': results, 'refs': self.refs})
+
+    def groups(self, operations):
+        group, created = [], set()
+        for index, operation in enumerate(operations):
+            if operation['resource'] not in CHANGESET_RESOURCES:
+                raise OperationFailed(index, status.HTTP_400_BAD_REQUEST,
+                                      {'resource': [f'"{operation["resource"]}" cannot be changed here.']})
+            key = (operation['op'], operation['resource'])
+            # A create that refers to a row created in the same group has to
+            # wait for that group to be inserted.
+            depends = references(operation['data']) & created
+            if group and (key != (group[0][1]['op'], group[0][1]['resource']) or depends):
+                yield (*group_key(group), group)
+                group, created = [], set()
+            group.append((index, operation))
+            if 'ref' in operation:
+                created.add(operation['ref'])
+        if group:
+            yield (*group_key(group), group)
+
+    def resource_view(self, resource, op):
+        from task_project.urls import router
+
+        viewset = next(viewset for prefix, viewset, _ in router.registry if prefix == resource)
+        action = {'create': 'create', 'update': 'partial_update', 'delete': 'destroy'}[op]
+        view = viewset(request=self.request, args=(), kwargs={}, format_kwarg=None, action=action)
+        view.check_permissions(self.request)
+        return view
+
+    def resolve(self, index, value):
+        if isinstance(value, dict):
+            if set(value) == {REF_KEY}:
+                if value[REF_KEY] not in self.refs:
+                    raise OperationFailed(index, status.HTTP_400_BAD_REQUEST,
+                                          {REF_KEY: [f'Unknown reference "{value[REF_KEY]}".']})
+                return self.refs[value[REF_KEY]]
+            return {name: self.resolve(index, item) for name, item in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(index, item) for item in value]
+        return value
+
+    def resolve_id(self, index, model, value):
+        try:
+            return model._meta.pk.to_python(self.resolve(index, value))
+        except DjangoValidationError as exc:
+            raise OperationFailed(index, status.HTTP_400_BAD_REQUEST, {'id': exc.messages})
+
+    def apply_create(self, view, group):
+        named = set(self.refs)
+        for index, operation in group:
+            if 'ref' not in operation:
+                continue
+            if operation['ref'] in named:
+                raise OperationFailed(index, status.HTTP_400_BAD_REQUEST, {'ref': ['This reference is already used.']})
+            named.add(operation['ref'])
+        data = [self.resolve(index, operation['data']) for index, operation in group]
+        serializer = view.get_serializer(data=data, many=True)
+        if not serializer.is_valid():
+            raise first_error(group, status.HTTP_400_BAD_REQUEST, serializer.errors)
+        try:
+            view.check_bulk_parents(serializer.validated_data)
+        except PermissionDenied as exc:
+            raise first_error(group, status.HTTP_403_FORBIDDEN, exc.detail)
+        view.perform_bulk_create(serializer)
+        for (index, operation), instance in zip(group, serializer.instance):
+            if 'ref' in operation:
+                self.refs[operation['ref']] = instance.pk
+        return serializer.data
+
+    def apply_update(self, view, group):
+        model = view.get_queryset().model
+        ids = [self.resolve_id(index, model, operation['id']) for index, operation in group]
+        instances = view.get_queryset().in_bulk(ids)
+        owner = parent_field(model).name
+        fields, results = set(), []
+        for (index, operation), pk in zip(group, ids):
+            instance = instances.get(pk)
+            if instance is None:
+                raise OperationFailed(index, status.HTTP_404_NOT_FOUND, {'detail': 'Not found.'})
+            serializer = view.get_serializer(instance, data=self.resolve(index, operation['data']), partial=True)
+            if not serializer.is_valid():
+                raise OperationFailed(index, status.HTTP_400_BAD_REQUEST, serializer.errors)
+            attrs = dict(serializer.validated_data)
+            # Rows stay with the user who owns them, as with creates.
+            attrs.pop(owner, None)
+            try:
+                if view.owned_parent_field in attrs:
+                    view.check_bulk_parents([attrs])
+            except PermissionDenied as exc:
+                raise OperationFailed(index, status.HTTP_403_FORBIDDEN, exc.detail[0])
+            for name, value in attrs.items():
+                setattr(instance, name, value)
+            fields.update(attrs)
+            results.append(instance)
+        if fields:
+            model.objects.bulk_update(list({instance.pk: instance for instance in results}.values()), fields)
+        return [view.get_serializer(instance).data for instance in results]
+
+    def apply_delete(self, view, group):
+        model = view.get_queryset().model
+        ids = [self.resolve_id(index, model, operation['id']) for index, operation in group]
+        queryset = view.get_queryset().filter(pk__in=ids)
+        found = set(queryset.values_list('pk', flat=True))
+        for (index, _), pk in zip(group, ids):
+            if pk not in found:
+                raise OperationFailed(index, status.HTTP_404_NOT_FOUND, {'detail': 'Not found.'})
+        queryset.delete()
+        return [None] * len(group)
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 18:20
+
+import core.operations
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('media', '0003_album_album_user_id_idx_photo_photo_album_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        core.operations.AddIndexConcurrently(
+            model_name='album',
+            index=models.Index(fields=['user', 'id'], include=['title'], name='album_user_id_cover_idx'),
+        ),
+        core.operations.RemoveIndexConcurrently(
+            model_name='album',
+            name='album_user_id_idx',
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-18 18:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models, transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def backfill_owner(apps, schema_editor):
+    Photo = apps.get_model('media', 'Photo')
+    Album = apps.get_model('media', 'Album')
+    owner = Album.objects.filter(pk=OuterRef('album_id')).values('user_id')[:1]
+    bounds = Photo.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return
+    # One short transaction per primary key range, so the backfill never
+    # holds row locks or queued trigger events for the whole table.
+    for start in range(bounds['low'], bounds['high'] + 1, BACKFILL_BATCH_SIZE):
+        with transaction.atomic(using=schema_editor.connection.alias):
+            Photo.objects.filter(pk__gte=start, pk__lt=start + BACKFILL_BATCH_SIZE,
+                                   owner__isnull=True).update(owner_id=Subquery(owner))
+
+
+class Migration(migrations.Migration):
+
+    # Each backfill batch commits on its own; the column becomes NOT NULL in
+    # 0007, once every batch has landed.
+    atomic = False
+
+    dependencies = [
+        ('media', '0004_album_user_id_cover_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='owner',
+            field=models.ForeignKey(null=True, db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_owner, migrations.RunPython.noop),
+    ]
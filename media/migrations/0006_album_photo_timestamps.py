@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-18 18:35
+
+import core.operations
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('media', '0005_photo_owner_photo_owner_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='album',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='album',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        core.operations.AddIndexConcurrently(
+            model_name='album',
+            index=models.Index(fields=['user', 'updated_at'], name='album_user_updated_idx'),
+        ),
+        core.operations.AddIndexConcurrently(
+            model_name='photo',
+            index=models.Index(fields=['owner', 'updated_at'], name='photo_owner_updated_idx'),
+        ),
+    ]
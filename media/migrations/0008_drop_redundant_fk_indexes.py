@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 19:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media', '0007_photo_owner_not_null'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # The composite (parent, ...) indexes already lead with these columns.
+        migrations.AlterField(
+            model_name='album',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='albums', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='photo',
+            name='album',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='photos', to='media.album'),
+        ),
+    ]
@@ -1,21 +1,45 @@
 from django.db import models
 from django.conf import settings
 
+from core.models import OwnedModel, VersionedModel
 
 
-class Album(models.Model):
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="albums")
+class Album(VersionedModel):
+    cache_resource = 'albums'
+    cache_owner_path = 'user_id'
+    cache_dependents = ('photos',)
+
+    # Every index below leads with user, so the foreign key needs none of its own.
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="albums",
+                             db_index=False)
     title = models.CharField(max_length=150)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], include=['title'], name='album_user_id_cover_idx'),
+            models.Index(fields=['user', 'updated_at'], name='album_user_updated_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
 
-class Photo(models.Model):
-    album = models.ForeignKey(Album, on_delete=models.CASCADE, related_name="photos")
+class Photo(OwnedModel):
+    cache_resource = 'photos'
+    owner_source = 'album__user_id'
+
+    # photo_album_id_idx leads with album, so the foreign key needs no index of its own.
+    album = models.ForeignKey(Album, on_delete=models.CASCADE, related_name="photos", db_index=False)
     title = models.CharField(max_length=150)
     url = models.URLField()
     thumbnailUrl = models.URLField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['album', 'id'], name='photo_album_id_idx'),
+            models.Index(fields=['owner', 'id'], name='photo_owner_id_idx'),
+            models.Index(fields=['owner', 'updated_at'], name='photo_owner_updated_idx'),
+        ]
+
     def __str__(self):
         return self.title
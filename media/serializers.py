@@ -1,11 +1,16 @@
 from rest_framework import serializers
 from .models import Album, Photo
 from django.contrib.auth import get_user_model
+from core.serializers import BatchedPrimaryKeyRelatedField, BulkListSerializer, EmbedMixin, SparseFieldsetMixin
 
 User = get_user_model()
 
 
-class AlbumSerializer(serializers.ModelSerializer):
+class AlbumSerializer(EmbedMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    embeddable = {'photos': 'media.serializers.PhotoSerializer'}
+    expandable = {'user': 'users.serializers.UserSerializer'}
+    preview = ('photos', 'id')
+
     userId = serializers.PrimaryKeyRelatedField(source='user', read_only=True)
 
     class Meta:
@@ -17,11 +22,14 @@ class AlbumSerializer(serializers.ModelSerializer):
         }
 
 
-class PhotoSerializer(serializers.ModelSerializer):
+class PhotoSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    serializer_related_field = BatchedPrimaryKeyRelatedField
+
     albumId = serializers.PrimaryKeyRelatedField(source='album', read_only=True)
 
     class Meta:
         model = Photo
+        list_serializer_class = BulkListSerializer
         fields = ['albumId', 'id', 'title', 'url', 'thumbnailUrl', 'album']
 
         extra_kwargs = {
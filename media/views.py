@@ -1,17 +1,19 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
-from rest_framework.response import Response
-from rest_framework import status
 from .models import Album, Photo
 from .serializers import AlbumSerializer, PhotoSerializer
-from django.core.cache import cache
 from rest_framework.exceptions import PermissionDenied
+from core.mixins import BulkCreateMixin, BulkDestroyMixin, CachedListMixin
 
 
-class AlbumViewSet(viewsets.ModelViewSet):
+class AlbumViewSet(CachedListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = AlbumSerializer
+    cache_resource = 'albums'
+    filter_params = {'userId': 'user_id'}
+    ordering_fields = ['id', 'title']
+    ordering = ['id']
 
     def get_queryset(self):
         return Album.objects.filter(user=self.request.user)
@@ -19,59 +21,29 @@ class AlbumViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-    def list(self, request, *args, **kwargs):
-        cache_key = f'album_list_user_{request.user.pk}'
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return Response(cached_data)
-        response = super().list(request, *args, **kwargs)
-        data_cache = response.data
-        cache.set(cache_key, data_cache)
-        return response
-
     @action(detail=True, methods=['get'])
     def photos(self, request, pk=None):
-        album = self.get_object()
-        cache_key = f'album_{album.pk}_photos'
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            return Response(cached_data)
-
-        photos = album.photos.all()
-        serializer = PhotoSerializer(photos, many=True)
-        data = serializer.data
-        cache.set(cache_key, data)
+        album = self.get_parent()
+        return self.nested_response(PhotoViewSet, album.user_id, album.photos.all())
 
-        return Response(data)
 
-
-class PhotoViewSet(viewsets.ModelViewSet):
+class PhotoViewSet(BulkCreateMixin, BulkDestroyMixin, CachedListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = PhotoSerializer
+    owned_parent_field = 'album'
+    owned_parent_message = "You can only create photos in your own albums."
+    cache_resource = 'photos'
+    filter_params = {'albumId': 'album_id'}
+    ordering_fields = ['id', 'title']
+    ordering = ['id']
 
     def get_queryset(self):
-        return Photo.objects.filter(album__user=self.request.user)
+        return Photo.objects.filter(owner=self.request.user)
 
     def perform_create(self, serializer):
         album = serializer.validated_data.get('album')
 
-        if album is None or album.user != self.request.user:
-            raise PermissionDenied("You can only create photos in your own albums.")
+        if album is None or album.user_id != self.request.user.pk:
+            raise PermissionDenied(self.owned_parent_message)
 
         serializer.save()
-
-    def list(self, request, *args, **kwargs):
-        cache_key = f'photo_list_user_{request.user.pk}'
-
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            return Response(cached_data)
-
-        response = super().list(request, *args, **kwargs)
-        data_cache = response.data
-
-        cache.set(cache_key, data_cache)
-
-        return response
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'todos',
     'media',
     'content',
+    'core',
     'rest_framework',
     'drf_yasg'
 ]
@@ -100,6 +101,40 @@ CACHES = {
     }
 }
 
+# Cached API responses are invalidated on write, so TIMEOUT only bounds how
+# long unused entries linger. FAMILIES overrides any option per resource.
+API_CACHE = {
+    'TIMEOUT': 60 * 60,
+    'STALE_GRACE': 60,
+    'EARLY_REFRESH_BETA': 1.0,
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 2.0,
+    'GENERATION_TTL': 5,
+    'INVALIDATION_CHANNEL': 'core.local.PostgresChannel',
+    'FAMILIES': {
+        'users': {
+            'TIMEOUT': 10 * 60,
+            'STALE_GRACE': 5 * 60,
+            'STALE_ACROSS_WRITES': True,
+            'LOCAL': True,
+        },
+        'todos': {
+            'LOCAL': True,
+        },
+    },
+}
+
+REST_FRAMEWORK = {
+    'DEFAULT_FILTER_BACKENDS': [
+        'core.filters.SparseFieldsetFilter',
+        'core.filters.EmbedFilter',
+        'core.filters.QueryParamFilter',
+        'rest_framework.filters.OrderingFilter',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.LinkHeaderCursorPagination',
+    'PAGE_SIZE': 100,
+}
+
 SWAGGER_SETTINGS = {
     # API bilgileri
     'INFO': {
@@ -1,6 +1,5 @@
 from django.contrib import admin
 from django.urls import path, include, re_path
-from rest_framework import routers
 
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
@@ -10,9 +9,11 @@ from users.views import UserViewSet
 from todos.views import TodoViewSet
 from content.views import PostViewSet, CommentViewSet
 from media.views import AlbumViewSet, PhotoViewSet
+from core.routers import BulkRouter
+from core.views import BatchView, ChangesetView
 
 
-router = routers.DefaultRouter()
+router = BulkRouter()
 
 
 router.register(r'users', UserViewSet, basename='user')
@@ -38,6 +39,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api-auth/', include('rest_framework.urls')),
 
+    path('v1/batch', BatchView.as_view(), name='batch'),
+    path('v1/changeset', ChangesetView.as_view(), name='changeset'),
     path('v1/', include(router.urls)),
 
     re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
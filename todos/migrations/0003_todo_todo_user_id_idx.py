@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 18:11
+
+import core.operations
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('todos', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        core.operations.AddIndexConcurrently(
+            model_name='todo',
+            index=models.Index(fields=['user', 'id'], name='todo_user_id_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 18:20
+
+import core.operations
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('todos', '0004_todo_todo_user_completed_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        core.operations.AddIndexConcurrently(
+            model_name='todo',
+            index=models.Index(fields=['user', 'id'], include=['title', 'completed'], name='todo_user_id_cover_idx'),
+        ),
+        core.operations.RemoveIndexConcurrently(
+            model_name='todo',
+            name='todo_user_id_idx',
+        ),
+        core.operations.AddIndexConcurrently(
+            model_name='todo',
+            index=models.Index(condition=models.Q(('completed', False)), fields=['user', 'id'],
+                               name='todo_user_open_idx'),
+        ),
+    ]
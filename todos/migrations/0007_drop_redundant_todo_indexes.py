@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-19 09:40
+
+import core.operations
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # DROP INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('todos', '0006_todo_timestamps'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # (user, completed, id) already serves completed=False lookups.
+        core.operations.RemoveIndexConcurrently(
+            model_name='todo',
+            name='todo_user_open_idx',
+        ),
+        migrations.AlterField(
+            model_name='todo',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='todos', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
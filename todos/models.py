@@ -1,11 +1,25 @@
 from django.db import models
 from django.conf import settings
 
+from core.models import VersionedModel
 
-class Todo(models.Model):
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="todos")
+
+class Todo(VersionedModel):
+    cache_resource = 'todos'
+    cache_owner_path = 'user_id'
+
+    # Every index below leads with user, so the foreign key needs none of its own.
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="todos",
+                             db_index=False)
     title = models.CharField(max_length=150)
     completed = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], include=['title', 'completed'], name='todo_user_id_cover_idx'),
+            models.Index(fields=['user', 'completed', 'id'], name='todo_user_completed_id_idx'),
+            models.Index(fields=['user', 'updated_at'], name='todo_user_updated_idx'),
+        ]
+
     def __str__(self):
         return self.title
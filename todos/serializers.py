@@ -1,15 +1,20 @@
 from rest_framework import serializers
 from .models import Todo
 from django.contrib.auth import get_user_model
+from core.serializers import BatchedPrimaryKeyRelatedField, BulkListSerializer, EmbedMixin, SparseFieldsetMixin
 
 User = get_user_model()
 
 
-class TodoSerializer(serializers.ModelSerializer):
+class TodoSerializer(EmbedMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    serializer_related_field = BatchedPrimaryKeyRelatedField
+    expandable = {'user': 'users.serializers.UserSerializer'}
+
     userId = serializers.PrimaryKeyRelatedField(source='user', read_only=True)
 
     class Meta:
         model = Todo
+        list_serializer_class = BulkListSerializer
         fields = ['userId', 'id', 'title', 'completed', 'user']
 
         extra_kwargs = {
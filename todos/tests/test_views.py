@@ -113,3 +113,12 @@ class TodoAPITest(APITestCase):
 
         self.assertEqual(Todo.objects.count(), 3)
         self.assertTrue(Todo.objects.filter(pk=self.other_todo.pk).exists())
+
+    def test_list_todos_reflects_changes(self):
+        self.client.get(self.list_url)
+
+        Todo.objects.create(user=self.user, title='Created After Caching', completed=False)
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
@@ -1,34 +1,23 @@
 from .models import Todo
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
 from .serializers import TodoSerializer
-from django.core.cache import cache
+from core.mixins import BulkCreateMixin, BulkDestroyMixin, BulkUpdateMixin, CachedListMixin
 
 
-class TodoViewSet(viewsets.ModelViewSet):
+class TodoViewSet(BulkCreateMixin, BulkUpdateMixin, BulkDestroyMixin, CachedListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     queryset = Todo.objects.all()
     serializer_class = TodoSerializer
+    cache_resource = 'todos'
+    filter_params = {'userId': 'user_id', 'completed': 'completed'}
+    ordering_fields = ['id', 'title', 'completed']
+    ordering = ['id']
+    owner_field = 'user'
+    bulk_update_fields = ('title', 'completed')
 
     def get_queryset(self):
         return Todo.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
-
-    def list(self, request, *args, **kwargs):
-        cache_key = f'todos_list_user_{request.user.pk}'
-
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            return Response(cached_data)
-
-        response = super().list(request, *args, **kwargs)
-
-        data_to_cache = response.data
-
-        cache.set(cache_key, data_to_cache, timeout=60)
-
-        return response
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 18:05
+
+import users.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='users',
+            managers=[
+                ('objects', users.models.UsersManager()),
+            ],
+        ),
+    ]
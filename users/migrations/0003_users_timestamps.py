@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 18:35
+
+import core.operations
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('users', '0002_alter_users_managers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='users',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='users',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        core.operations.AddIndexConcurrently(
+            model_name='users',
+            index=models.Index(fields=['updated_at'], name='users_updated_at_idx'),
+        ),
+    ]
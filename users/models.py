@@ -1,8 +1,16 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 
+from core.models import VersionedModel, VersionedQuerySet
+
+
+class UsersManager(UserManager.from_queryset(VersionedQuerySet)):
+    pass
+
+
+class Users(AbstractUser, VersionedModel):
+    cache_resource = 'users'
 
-class Users(AbstractUser):
     street = models.CharField(max_length=255)
     suite = models.CharField(max_length=100)
     city = models.CharField(max_length=100)
@@ -13,5 +21,12 @@ class Users(AbstractUser):
     website = models.URLField(max_length=255, null=True, blank=True)
     company_name = models.CharField(max_length=255, blank=True)
 
+    objects = UsersManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['updated_at'], name='users_updated_at_idx'),
+        ]
+
     def __str__(self):
         return self.username
@@ -1,8 +1,15 @@
 from rest_framework import serializers
 from .models import Users
+from core.serializers import SparseFieldsetMixin
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    sparse_sources = {
+        'name': ('first_name', 'last_name'),
+        'address': ('street', 'suite', 'city', 'zipcode', 'lat', 'lng'),
+        'company': ('company_name',),
+    }
+
     name = serializers.SerializerMethodField()
     address = serializers.SerializerMethodField()
     company = serializers.SerializerMethodField()
@@ -1,77 +1,80 @@
+from django.http import StreamingHttpResponse
 from .models import Users
 from rest_framework import viewsets
 from rest_framework.decorators import action
-from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
 from .serializers import UserSerializer
-from content.serializers import PostSerializer
-from media.serializers import AlbumSerializer
-from todos.serializers import TodoSerializer
-from django.core.cache import cache
-
-
-class UserViewSet(viewsets.ModelViewSet):
+from content.models import Comment, Post
+from content.views import PostViewSet
+from media.models import Album, Photo
+from media.views import AlbumViewSet
+from todos.models import Todo
+from todos.views import TodoViewSet
+from core.mixins import CachedListMixin
+from core.serializers import EMBED_PARAM, PREVIEW_PARAM, requested_relations
+from core.renderers import CSVRenderer, ExportSection, NDJSONRenderer
+
+EXPORTS = (
+    ('post', Post, {'id': 'id', 'userId': 'user_id', 'title': 'title', 'body': 'body'}),
+    ('comment', Comment, {'id': 'id', 'postId': 'post_id', 'name': 'name', 'email': 'email', 'body': 'body'}),
+    ('album', Album, {'id': 'id', 'userId': 'user_id', 'title': 'title'}),
+    ('photo', Photo, {'id': 'id', 'albumId': 'album_id', 'title': 'title', 'url': 'url',
+                      'thumbnailUrl': 'thumbnailUrl'}),
+    ('todo', Todo, {'id': 'id', 'userId': 'user_id', 'title': 'title', 'completed': 'completed'}),
+)
+
+
+class UserViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = Users.objects.all()
     serializer_class = UserSerializer
-
-    def list(self, request, *args, **kwargs):
-        cache_key = 'users_list'
-
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            return Response(cached_data)
-
-        response = super().list(request, *args, **kwargs)
-        data_cache = response.data
-
-        cache.set(cache_key, data_cache)
-
-        return response
+    cache_resource = 'users'
+    ordering_fields = ['id', 'username']
+    ordering = ['id']
+
+    def get_cache_owner(self):
+        return None
+
+    def check_owned_children(self, user):
+        # Comments and photos are only listed to their owner, so another
+        # user's posts and albums cannot embed or preview them.
+        request = self.request
+        if user.pk == request.user.pk or request.user.is_staff:
+            return
+        if requested_relations(request, EMBED_PARAM) or PREVIEW_PARAM in request.query_params:
+            raise PermissionDenied("You can only embed or preview your own posts' comments and albums' photos.")
 
     @action(detail=True, methods=['get'])
     def posts(self, request, pk=None):
-        user = self.get_object()
-        cache_key = f'user_posts_{user.pk}'
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            return Response(cached_data)
-
-        posts = user.posts.all()
-        serializer = PostSerializer(posts, many=True)
-        data = serializer.data
-        cache.set(cache_key, data)
-
-        return Response(data)
+        user = self.get_parent()
+        self.check_owned_children(user)
+        return self.nested_response(PostViewSet, user.pk, user.posts.all())
 
     @action(detail=True, methods=['get'])
     def albums(self, request, pk=None):
-        user = self.get_object()
-        cache_key = f'user_albums_{user.pk}'
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            return Response(cached_data)
-
-        albums = user.albums.all()
-        serializer = AlbumSerializer(albums, many=True)
-        data = serializer.data
-        cache.set(cache_key, data)
-
-        return Response(data)
+        user = self.get_parent()
+        self.check_owned_children(user)
+        return self.nested_response(AlbumViewSet, user.pk, user.albums.all())
 
     @action(detail=True, methods=['get'])
     def todos(self, request, pk=None):
-        user = self.get_object()
-        cache_key = f'user_todos_{user.pk}'
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            return Response(cached_data)
-
-        todos = user.todos.all()
-        serializer = TodoSerializer(todos, many=True)
-        data = serializer.data
-        cache.set(cache_key, data)
+        user = self.get_parent()
+        return self.nested_response(TodoViewSet, user.pk, user.todos.all())
 
-        return Response(data)
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated],
+            renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request, pk=None):
+        user = self.get_object()
+        if user.pk != request.user.pk and not request.user.is_staff:
+            raise PermissionDenied('You can only export your own data.')
+        # Comments and photos carry their owner, so every section is one
+        # indexed scan of the user's rows, streamed in primary key order.
+        sections = [
+            ExportSection(name, model.objects.filter(**{model.cache_owner_path: user.pk}).order_by('pk'), fields)
+            for name, model, fields in EXPORTS
+        ]
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(renderer.stream(sections),
+                                         content_type=f'{renderer.media_type}; charset={renderer.charset}')
+        response['Content-Disposition'] = f'attachment; filename="user-{user.pk}.{renderer.format}"'
+        return response